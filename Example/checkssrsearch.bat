@@ -0,0 +1,20 @@
+@ECHO OFF
+SET SEQFILE=sequences.fasta
+REM
+REM ====  Compare ssrsearch.py with the output of misa.pl  ====
+REM
+REM --------- set path ---------------------
+REM PYSSRSTAT_HOME or 
+IF "%PYSSRSTAT_HOME%"=="" GOTO LOneup
+IF NOT "%PYSSRSTAT_HOME%"=="" GOTO LHome
+:LHome
+SET PSS=%PYSSRSTAT_HOME%
+GOTO Running
+:LOneup
+SET PSS=%~dp0..
+GOTO Running
+REM
+REM --------------  Run  -------------------
+:Running
+ECHO Run ssrsearch, compare with %SEQFILE%.misa and %SEQFILE%.statistics
+call %PSS%\ssrsearch.bat %SEQFILE% -cmp
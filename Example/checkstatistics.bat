@@ -0,0 +1,33 @@
+@ECHO OFF
+SET SEQFILE=sequences.fasta
+REM
+REM ====  statistics_misa.py -db and mergestatistics.py with a unit size without SSRs  ====
+REM
+REM --------- set path ---------------------
+REM PYSSRSTAT_HOME or 
+IF "%PYSSRSTAT_HOME%"=="" GOTO LOneup
+IF NOT "%PYSSRSTAT_HOME%"=="" GOTO LHome
+:LHome
+SET PSS=%PYSSRSTAT_HOME%
+GOTO Running
+:LOneup
+SET PSS=%~dp0..
+GOTO Running
+REM
+REM --------------  Run  -------------------
+:Running
+ECHO MISA-file without the Penta SSRs: check-nopenta.misa
+findstr /V /B "Seq_p5_" %SEQFILE%.misa > check-nopenta.misa
+ECHO Run statistics_misa -db
+call %PSS%\statistics_misa.bat check-nopenta.misa -db %SEQFILE% -ini misa.ini -rpc -o check-nopenta-analysis.txt
+IF ERRORLEVEL 1 GOTO Failed
+ECHO Run statistics_misa -db -pa and mergestatistics
+call %PSS%\statistics_misa.bat check-nopenta.misa -db %SEQFILE% -ini misa.ini -pa -o check-nopenta-partial.txt
+IF ERRORLEVEL 1 GOTO Failed
+call %PSS%\mergestatistics.bat check-nopenta-partial.txt -rpc -o check-nopenta-merged.txt
+IF ERRORLEVEL 1 GOTO Failed
+ECHO Check passed, check-nopenta-analysis.txt and check-nopenta-merged.txt have the same numbers
+GOTO End
+:Failed
+ECHO Check FAILED
+:End
@@ -5,11 +5,26 @@ REM ====  MISA output files  ======
 REM
 IF EXIST sequences.fasta.misa DEL sequences.fasta.misa
 IF EXIST sequences.fasta.statistics DEL sequences.fasta.statistics
+IF EXIST sequences.fasta.misa.misac DEL sequences.fasta.misa.misac
 REM
 REM ====== PySSRstat  ========
 REM 
 REM ---  statistics_misa
 IF EXIST repeats_analysis.txt DEL repeats_analysis.txt
+IF EXIST repeats_distribution_class.tsv DEL repeats_distribution_class.tsv
+IF EXIST repeats_distribution_class.bin DEL repeats_distribution_class.bin
+IF EXIST repeats_distribution_unit.tsv DEL repeats_distribution_unit.tsv
+IF EXIST repeats_distribution_unit.bin DEL repeats_distribution_unit.bin
+REM
+REM ---  checkstatistics
+IF EXIST check-nopenta.misa DEL check-nopenta.misa
+IF EXIST check-nopenta.misa.misac DEL check-nopenta.misa.misac
+IF EXIST check-nopenta-analysis.txt DEL check-nopenta-analysis.txt
+IF EXIST check-nopenta-partial.txt DEL check-nopenta-partial.txt
+IF EXIST check-nopenta-merged.txt DEL check-nopenta-merged.txt
+REM
+REM ---  ssrdensity
+IF EXIST ssr-*.bedgraph DEL ssr-*.bedgraph
 REM
 REM ---  statgetlongest
 IF EXIST longest-sequences-list.txt DEL longest-sequences-list.txt
@@ -18,8 +33,10 @@ REM --- filterrepeatsmisa
 IF EXIST filtered-repeats-sequence-list.txt DEL filtered-repeats-sequence-list.txt
 REM
 REM --- getsequences
-IF EXIST index.txt DEL index.txt
+IF EXIST sequences.fasta.fidx DEL sequences.fasta.fidx
 IF EXIST getsequences-info.txt DEL getsequences-info.txt
 IF EXIST repeats-sequences.fas DEL repeats-sequences.fas
 IF EXIST repeats-sequences-border.fas DEL repeats-sequences-border.fas
+IF EXIST repeats-flanks.fas DEL repeats-flanks.fas
 IF EXIST border.txt DEL border.txt
+IF EXIST border-sweep.txt DEL border-sweep.txt
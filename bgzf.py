@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""Random access to files compressed with bgzip (BGZF format)
+
+A BGZF file is a series of gzip blocks, each holding at most 64 KB of
+uncompressed data. The table of blocks maps an offset in the uncompressed
+data to the block that contains it, like the .gzi index of samtools. To
+read a range only the blocks covering it are decompressed.
+
+The table of blocks is built from the block headers without decompressing
+the file and stored in the binary cache file <file>.bgzi (see filecache.py).
+
+Author: Mario Nenno
+Version: 2015-08-31
+Copyright: see file LICENCE.txt
+
+"""
+import bisect
+import struct
+import zlib
+
+import filecache
+
+# extension of the cache file with the table of blocks
+blocks_extension = '.bgzi'
+
+# kind of cache file of the table of blocks
+cache_kind = b'BGZI'
+
+# fixed part of the gzip header of a block: magic, CM, FLG, MTIME, XFL, OS, XLEN
+_block_header = struct.Struct('<2sBBIBBH')
+_gzip_magic = b'\x1f\x8b'
+_flag_extra = 4
+
+
+def _block_size(infile):
+    """ Size of the block at the current position of the file, None at the end of the file
+    """
+    header = infile.read(_block_header.size)
+    if len(header) < _block_header.size:
+        return None
+    magic, cm, flags, mtime, xfl, os_id, xlen = _block_header.unpack(header)
+    if magic != _gzip_magic or not flags & _flag_extra:
+        return -1
+    extra = infile.read(xlen)
+    pos = 0
+    while pos + 4 <= len(extra):
+        # subfield: SI1, SI2, SLEN, data
+        si1, si2, slen = struct.unpack_from('<BBH', extra, pos)
+        if si1 == 66 and si2 == 67 and slen == 2:
+            # 'BC': total block size minus 1
+            return struct.unpack_from('<H', extra, pos + 4)[0] + 1
+        pos += 4 + slen
+    return -1
+
+
+def is_bgzf(filename):
+    with open(filename, 'rb') as infile:
+        return _block_size(infile) not in (None, -1)
+
+
+def scan_blocks(filename):
+    """ Table of blocks as two lists: compressed and uncompressed offset of each block
+    """
+    coffsets = []
+    uoffsets = []
+    coffset = 0
+    uoffset = 0
+    with open(filename, 'rb') as infile:
+        while True:
+            infile.seek(coffset)
+            size = _block_size(infile)
+            if size is None:
+                break
+            if size == -1:
+                raise ValueError("File '{}' is not compressed with bgzip".format(filename))
+            # the last 4 bytes of a block are the uncompressed size
+            infile.seek(coffset + size - 4)
+            isize = struct.unpack('<I', infile.read(4))[0]
+            coffsets.append(coffset)
+            uoffsets.append(uoffset)
+            coffset += size
+            uoffset += isize
+    # end of the file as sentinel
+    coffsets.append(coffset)
+    uoffsets.append(uoffset)
+    return coffsets, uoffsets
+
+
+def load_blocks(filename, cachedir=None):
+    """ Load the table of blocks from its cache, (re)build the cache if missing or stale
+    """
+    blocksfile = filecache.cache_filename(filename, blocks_extension, cachedir)
+    stamp = filecache.source_stamp(filename)
+    sections = filecache.read_cache(blocksfile, cache_kind, stamp)
+    if sections is not None:
+        return filecache.unpack_array('Q', sections[b'COFF']), filecache.unpack_array('Q', sections[b'UOFF'])
+    coffsets, uoffsets = scan_blocks(filename)
+    filecache.write_cache(blocksfile, cache_kind, stamp, {
+        b'COFF': filecache.pack_array('Q', coffsets),
+        b'UOFF': filecache.pack_array('Q', uoffsets),
+    })
+    return coffsets, uoffsets
+
+
+class BgzfFile(object):
+    """ Read ranges of the uncompressed data of a BGZF file
+    """
+
+    def __init__(self, filename, blocks=None, cachedir=None):
+        if blocks is None:
+            blocks = load_blocks(filename, cachedir)
+        self.coffsets, self.uoffsets = blocks
+        self._file = open(filename, 'rb')
+        # last decompressed block, reads of a sequence often stay in one block
+        self._block_idx = -1
+        self._block_data = b''
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def _block(self, idx):
+        if idx != self._block_idx:
+            self._file.seek(self.coffsets[idx])
+            data = self._file.read(self.coffsets[idx + 1] - self.coffsets[idx])
+            # wbits 31: deflate data with gzip header and trailer
+            self._block_data = zlib.decompress(data, 31)
+            self._block_idx = idx
+        return self._block_data
+
+    def read(self, start, length):
+        """ Read length bytes from offset start of the uncompressed data
+        """
+        chunks = []
+        idx = bisect.bisect_right(self.uoffsets, start) - 1
+        pos = start - self.uoffsets[idx]
+        last_idx = len(self.coffsets) - 1
+        while length > 0 and idx < last_idx:
+            chunk = self._block(idx)[pos:pos + length]
+            chunks.append(chunk)
+            length -= len(chunk)
+            pos = 0
+            idx += 1
+        return b''.join(chunks)
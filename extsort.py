@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""Stable sort with bounded memory
+
+Up to max_items values are sorted in memory. More values are sorted in
+runs of max_items values, each run is written to a temporary file and the
+runs are merged while reading them back. Values with equal keys keep their
+order of input, like with sorted(). With a Sorter the values are added
+block by block, e.g. while reading a stream.
+
+Author: Mario Nenno
+Version: 2015-08-31
+Copyright: see file LICENCE.txt
+
+"""
+import heapq
+import itertools
+import pickle
+import tempfile
+
+# number of values written to a run file in one block
+_block_size = 10000
+
+
+def _write_run(values, tmpdir):
+    run = tempfile.TemporaryFile(dir=tmpdir)
+    for i in range(0, len(values), _block_size):
+        pickle.dump(values[i:i + _block_size], run, pickle.HIGHEST_PROTOCOL)
+    run.seek(0)
+    return run
+
+
+def _read_run(run):
+    with run:
+        while True:
+            try:
+                block = pickle.load(run)
+            except EOFError:
+                return
+            for value in block:
+                yield value
+
+
+class Sorter(object):
+    """ Values added one block after the other, sorted like sort() when all are added
+    """
+
+    def __init__(self, key=None, reverse=False, max_items=None, tmpdir=None):
+        if max_items is not None and max_items < 1:
+            raise ValueError("Maximum number of values in memory must be at least 1")
+        self.key = key
+        self.reverse = reverse
+        self.max_items = max_items
+        self.tmpdir = tmpdir
+        self._values = []
+        self._runs = []
+
+    def extend(self, values):
+        """ Add values, a run is spilled whenever max_items values are in memory
+        """
+        if self.max_items is None:
+            self._values.extend(values)
+            return
+        values = iter(values)
+        while True:
+            self._values.extend(itertools.islice(values, self.max_items - len(self._values)))
+            if len(self._values) < self.max_items:
+                return
+            self._spill()
+
+    def _spill(self):
+        self._values.sort(key=self.key, reverse=self.reverse)
+        self._runs.append(_write_run(self._values, self.tmpdir))
+        self._values = []
+
+    def sorted(self):
+        """ Iterator over all values added, sorted by key
+        """
+        if not self._runs:
+            values = self._values
+            self._values = []
+            return iter(sorted(values, key=self.key, reverse=self.reverse))
+        if self._values:
+            self._spill()
+        runs = self._runs
+        self._runs = []
+        # on equal keys merge takes the value of the earlier run first
+        return heapq.merge(*[_read_run(run) for run in runs], key=self.key, reverse=self.reverse)
+
+
+def sort(values, key=None, reverse=False, max_items=None, tmpdir=None):
+    """ Iterator over the values sorted by key
+
+    With max_items at most max_items values are kept in memory, runs are
+    spilled into temporary files in tmpdir (default directory of the
+    system if None).
+    """
+    sorter = Sorter(key, reverse, max_items, tmpdir)
+    sorter.extend(values)
+    return sorter.sorted()
@@ -0,0 +1,359 @@
+#!/usr/bin/env python3
+"""Index of a FASTA file for random access to its sequences
+
+The index holds for each sequence the values of the faidx format of
+samtools:
+
+    id    length    offset    linebases    linewidth
+
+id        - sequence id like MISA writes it (whitespace replaced by '_')
+length    - number of bases of the sequence
+offset    - byte offset of the first base in the db file
+linebases - number of bases per line
+linewidth - number of bytes per line including the line break
+
+Together with the index the runs of N in each sequence are collected, to
+check a border for N without reading the sequence (NRunIndex).
+
+The index is stored in the binary cache file <db-file>.fidx (see
+filecache.py) together with the path, size and modification time of the db
+file. A warm run loads the cache without scanning the db file, a stale cache
+is rebuilt automatically. The index loaded last is kept in memory for all
+programs run in one process (see pyssrstat.py); clear_cache() releases it.
+
+With the index a sequence is read by seeking directly to its first base,
+without scanning the db file. SequenceFile maps the db file into memory
+and returns only the requested sequence or window. A db file compressed
+with bgzip is read through its table of blocks (see bgzf.py), the offsets
+of the index are then offsets in the uncompressed data.
+
+Author: Mario Nenno
+Version: 2015-08-31
+Copyright: see file LICENCE.txt
+
+"""
+import array
+import bisect
+import mmap
+import os
+import re
+
+import filecache
+import fileio
+
+# extension of the index file, appended to the name of the db file
+index_extension = '.fidx'
+
+# kind of cache file of the index, FID2 since the first of duplicate ids is
+# indexed (older caches could have N runs not matching their sequences)
+cache_kind = b'FID2'
+
+_n_run = re.compile(b'N+')
+
+# indexes loaded in this process, the index and N runs of the last db file are kept (see clear_cache())
+_loaded = filecache.Loaded(max_items=1)
+
+
+def seqid_from_header(header):
+    """ Sequence id of a FASTA header line (bytes) like MISA creates it
+    """
+    # for compatibility change seq id like misa
+    # replace whitespace with underscore
+    header = header.decode().rstrip('\r\n')
+    return re.sub(r'\s', '_', header[1:].strip())
+
+
+def _add_record(index, run_ptr, run_starts, run_ends, seq_id, record):
+    """ Add a scanned sequence to the index, the N runs collected last belong to it
+
+    Of several sequences with the same id only the first is kept, the N
+    runs of a later one are dropped so the runs stay in the order of the index.
+    """
+    if seq_id in index:
+        del run_starts[run_ptr[-1]:]
+        del run_ends[run_ptr[-1]:]
+        return
+    index[seq_id] = record
+    run_ptr.append(len(run_starts))
+
+
+def build_index(filename):
+    """ Scan the db file once and return the index and the N runs of all sequences
+
+    The index is a dictionary, key is the sequence id, value the tuple
+    (length, offset, linebases, linewidth). The N runs are a NRunIndex.
+    Of several sequences with the same id the first one is indexed.
+    """
+    index = {}
+    # N runs of all sequences, the runs of the i-th sequence are
+    # run_starts[run_ptr[i]:run_ptr[i+1]] (0-based, end excluded)
+    run_ptr = [0]
+    run_starts = array.array('Q')
+    run_ends = array.array('Q')
+    seq_id = None
+    length = offset = linebases = linewidth = 0
+    is_last_line = False
+    pos = 0
+    with fileio.open_binary(filename) as infile:
+        for line in infile:
+            line_len = len(line)
+            if line.startswith(b'>'):
+                if seq_id is not None:
+                    _add_record(index, run_ptr, run_starts, run_ends, seq_id,
+                                (length, offset, linebases, linewidth))
+                seq_id = seqid_from_header(line)
+                length = linebases = linewidth = 0
+                offset = pos + line_len
+                is_last_line = False
+            elif seq_id is not None:
+                bases = line.rstrip(b'\r\n')
+                num_bases = len(bases)
+                if num_bases > 0:
+                    if is_last_line or (linebases > 0 and num_bases > linebases):
+                        raise ValueError("Different line length in sequence '{}'".format(seq_id))
+                    if linebases == 0:
+                        linebases = num_bases
+                        linewidth = line_len
+                    elif num_bases < linebases:
+                        # a shorter line must be the last line of the sequence
+                        is_last_line = True
+                    if b'N' in bases:
+                        for m in _n_run.finditer(bases):
+                            start = length + m.start()
+                            # join with a run ending at the end of the previous line
+                            if len(run_starts) > run_ptr[-1] and run_ends[-1] == start:
+                                run_ends[-1] = length + m.end()
+                            else:
+                                run_starts.append(start)
+                                run_ends.append(length + m.end())
+                else:
+                    is_last_line = True
+                length += num_bases
+            pos += line_len
+        if seq_id is not None:
+            _add_record(index, run_ptr, run_starts, run_ends, seq_id,
+                        (length, offset, linebases, linewidth))
+    return index, NRunIndex(list(index.keys()), array.array('Q', run_ptr), run_starts, run_ends)
+
+
+class NRunIndex(object):
+    """ Runs of N in the sequences of a db file
+
+    The runs of each sequence are kept as sorted arrays of start and end
+    positions (0-based, end excluded), a check of a window is a binary search.
+    """
+
+    def __init__(self, names, run_ptr, run_starts, run_ends):
+        self._seq_idx = dict((name, i) for i, name in enumerate(names))
+        self.run_ptr = run_ptr
+        self.run_starts = run_starts
+        self.run_ends = run_ends
+
+    def _runs(self, seq_id):
+        i = self._seq_idx[seq_id]
+        return self.run_ptr[i], self.run_ptr[i + 1]
+
+    def has_n(self, seq_id, start, end):
+        """ Is there an N between start and end (0-based, end excluded)?
+        """
+        lo, hi = self._runs(seq_id)
+        # first run ending after start
+        k = bisect.bisect_right(self.run_ends, start, lo, hi)
+        return k < hi and self.run_starts[k] < end
+
+    def free_flanks(self, seq_id, start, end, length):
+        """ Number of bases without N before start and after end (0-based, end excluded)
+
+        length is the length of the sequence.
+        """
+        lo, hi = self._runs(seq_id)
+        # last run starting before start
+        j = bisect.bisect_left(self.run_starts, start, lo, hi) - 1
+        upstream = start
+        if j >= lo:
+            upstream = start - min(self.run_ends[j], start)
+        # first run ending after end
+        k = bisect.bisect_right(self.run_ends, end, lo, hi)
+        downstream = length - end
+        if k < hi:
+            downstream = max(self.run_starts[k], end) - end
+        return upstream, downstream
+
+
+def pack_index(index, nruns):
+    """ Index and N runs as sections of a binary cache file
+    """
+    records = list(index.values())
+    return {
+        b'NAME': '\n'.join(index.keys()).encode(),
+        b'LENS': filecache.pack_array('Q', [r[0] for r in records]),
+        b'OFFS': filecache.pack_array('Q', [r[1] for r in records]),
+        b'LBAS': filecache.pack_array('Q', [r[2] for r in records]),
+        b'LWID': filecache.pack_array('Q', [r[3] for r in records]),
+        b'NPTR': filecache.pack_array('Q', nruns.run_ptr),
+        b'NSTA': filecache.pack_array('Q', nruns.run_starts),
+        b'NEND': filecache.pack_array('Q', nruns.run_ends),
+    }
+
+
+def unpack_index(sections):
+    index = {}
+    names = []
+    if sections[b'NAME']:
+        names = sections[b'NAME'].decode().split('\n')
+    lengths = filecache.unpack_array('Q', sections[b'LENS'])
+    offsets = filecache.unpack_array('Q', sections[b'OFFS'])
+    linebases = filecache.unpack_array('Q', sections[b'LBAS'])
+    linewidths = filecache.unpack_array('Q', sections[b'LWID'])
+    for i, seq_id in enumerate(names):
+        index[seq_id] = (lengths[i], offsets[i], linebases[i], linewidths[i])
+    nruns = NRunIndex(names, filecache.unpack_array('Q', sections[b'NPTR']),
+                      filecache.unpack_array('Q', sections[b'NSTA']),
+                      filecache.unpack_array('Q', sections[b'NEND']))
+    return index, nruns
+
+
+def load_index_nruns(filename, cachedir=None, checksum=False):
+    """ Load the index and the N runs of the db file, see load_index()
+    """
+    indexfile = filecache.cache_filename(filename, index_extension, cachedir)
+    stamp = filecache.source_stamp(filename, checksum)
+    loaded = _loaded.get(indexfile, stamp)
+    if loaded is not None:
+        return loaded
+    sections = filecache.read_cache(indexfile, cache_kind, stamp)
+    if sections is not None and b'NPTR' in sections:
+        index, nruns = unpack_index(sections)
+    else:
+        index, nruns = build_index(filename)
+        filecache.write_cache(indexfile, cache_kind, stamp, pack_index(index, nruns))
+    _loaded.put(indexfile, stamp, (index, nruns))
+    return index, nruns
+
+
+def clear_cache():
+    """ Release the index kept in memory, e.g. in a long-lived process
+    """
+    _loaded.clear()
+
+
+def load_index(filename, cachedir=None, checksum=False):
+    """ Load the index of the db file from its cache, (re)build the cache if missing or stale
+
+    The cache is valid only for the db file with the same path, size and
+    modification time, and optionally the same SHA-1 hash of the content.
+    """
+    return load_index_nruns(filename, cachedir, checksum)[0]
+
+
+def load_nruns(filename, cachedir=None, checksum=False):
+    """ Load the N runs of the db file, see load_index()
+    """
+    return load_index_nruns(filename, cachedir, checksum)[1]
+
+
+def raw_length(record, start, end):
+    """ Number of bytes in the db file covering the bases start to end (0-based, end excluded)
+    """
+    length, offset, linebases, linewidth = record
+    if end <= start:
+        return 0
+    first = (start // linebases) * linewidth + start % linebases
+    last = ((end - 1) // linebases) * linewidth + (end - 1) % linebases
+    return last - first + 1
+
+
+def raw_offset(record, pos):
+    """ Byte offset in the db file of the base at position pos (0-based)
+    """
+    length, offset, linebases, linewidth = record
+    if linebases == 0:
+        return offset
+    return offset + (pos // linebases) * linewidth + pos % linebases
+
+
+def check_random_access(filename):
+    """ Raise ValueError if the db file can not be read by random access
+
+    A compressed db file must be compressed with bgzip, not gzip. The check
+    reads only the first block, it can be done before the index is built.
+    """
+    if fileio.is_gzip(filename):
+        import bgzf
+        if not bgzf.is_bgzf(filename):
+            raise ValueError("Db file '{}' is compressed with gzip, random access needs bgzip".format(filename))
+
+
+class SequenceFile(object):
+    """ Memory-mapped access to the sequences of an indexed db file
+
+    The db file is not read into memory, the operating system pages in only
+    the parts of the file that are accessed.
+    """
+
+    def __init__(self, filename, index=None, cachedir=None):
+        if index is None:
+            index = load_index(filename, cachedir)
+        self.filename = filename
+        self.index = index
+        self._file = None
+        self._map = None
+        self._bgzf = None
+        check_random_access(filename)
+        if fileio.is_gzip(filename):
+            import bgzf
+            self._bgzf = bgzf.BgzfFile(filename, cachedir=cachedir)
+        else:
+            self._file = open(filename, 'rb')
+            if os.path.getsize(filename) > 0:
+                self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            else:
+                # an empty file can not be mapped
+                self._map = b''
+
+    def close(self):
+        if self._bgzf is not None:
+            self._bgzf.close()
+        else:
+            if isinstance(self._map, mmap.mmap):
+                self._map.close()
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def _window(self, seq_id, start, end):
+        record = self.index[seq_id]
+        length = record[0]
+        if end is None or end > length:
+            end = length
+        if start < 0:
+            start = 0
+        first = raw_offset(record, start)
+        return first, first + raw_length(record, start, end)
+
+    def raw(self, seq_id, start=0, end=None):
+        """ Zero-copy view of the db file covering the bases start to end (0-based, end excluded)
+
+        The view still contains the line breaks and must be released before
+        the file is closed.
+        """
+        first, last = self._window(seq_id, start, end)
+        if self._bgzf is not None:
+            # only the decompressed copy of the range can be viewed
+            return memoryview(self._bgzf.read(first, last - first))
+        return memoryview(self._map)[first:last]
+
+    def fetch(self, seq_id, start=0, end=None):
+        """ Bases start to end (0-based, end excluded) of a sequence as bytes without line breaks
+        """
+        first, last = self._window(seq_id, start, end)
+        if self._bgzf is not None:
+            data = self._bgzf.read(first, last - first)
+        else:
+            data = self._map[first:last]
+        # line breaks are removed only in the requested range
+        return data.translate(None, b'\r\n')
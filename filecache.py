@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+"""Binary cache files for data derived from an input file
+
+A cache file starts with a header that identifies the input file it was
+created from: absolute path, size, modification time and optionally a
+SHA-1 hash of the content. The header is followed by sections, each with
+a 4 byte tag, its length and the data.
+
+A cache is used only if its header matches the input file, otherwise it is
+stale and must be rebuilt. The data of each section starts at a multiple
+of 8 bytes, so a cache file can be memory-mapped and its arrays used
+without copying them. By default a cache file is stored next to the
+input file; a cache directory can be given instead, either as parameter or
+with the environment variable PYSSRSTAT_CACHE. Data not derived from an
+input file of the user is cached in the cache directory of the user (see
+user_cache_dir()), the directory of the programs may be read-only.
+
+The data loaded from cache files can be kept in memory for the next
+program run in the same process (Loaded), only the data of the input
+files used last is kept.
+
+Author: Mario Nenno
+Version: 2015-08-31
+Copyright: see file LICENCE.txt
+
+"""
+import array
+import hashlib
+import mmap
+import os
+import struct
+import sys
+from collections import OrderedDict
+
+# first bytes of each cache file and version of the format
+cache_magic = b'PYSSRSTAT'
+cache_version = 2
+
+# environment variable with the default cache directory
+cache_env = 'PYSSRSTAT_CACHE'
+
+# header: magic, version, kind, size, mtime in ns, length of path, SHA-1 (or zeros)
+_header = struct.Struct('<9sH4sQqI20s')
+# section: tag, number of padding bytes before the data, length of the data
+_section = struct.Struct('<4sIQ')
+_align = 8
+
+
+def cache_filename(filename, extension, cachedir=None):
+    """ Name of the cache file of an input file
+
+    Without cache directory the cache file is stored next to the input
+    file, else in the cache directory with a name unique for the path of the
+    input file.
+    """
+    if cachedir is None:
+        cachedir = os.environ.get(cache_env)
+    if not cachedir:
+        return filename + extension
+    path = os.path.abspath(filename)
+    path_hash = hashlib.sha1(path.encode()).hexdigest()[:16]
+    return os.path.join(cachedir, "{}.{}{}".format(os.path.basename(filename), path_hash, extension))
+
+
+def user_cache_dir():
+    """ Cache directory of the user, PYSSRSTAT_CACHE if set
+
+    %LOCALAPPDATA%\\PySSRstat on Windows, else $XDG_CACHE_HOME/pyssrstat or
+    ~/.cache/pyssrstat. The directory is created with the first cache file.
+    """
+    cachedir = os.environ.get(cache_env)
+    if not cachedir:
+        if sys.platform == 'win32' and os.environ.get('LOCALAPPDATA'):
+            cachedir = os.path.join(os.environ['LOCALAPPDATA'], 'PySSRstat')
+        else:
+            base = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+            cachedir = os.path.join(base, 'pyssrstat')
+    return cachedir
+
+
+def file_checksum(filename):
+    sha1 = hashlib.sha1()
+    with open(filename, 'rb') as infile:
+        for block in iter(lambda: infile.read(1 << 20), b''):
+            sha1.update(block)
+    return sha1.digest()
+
+
+def source_stamp(filename, checksum=False):
+    """ Identity of an input file: (path, size, mtime in ns, SHA-1 or None)
+    """
+    stat = os.stat(filename)
+    digest = None
+    if checksum:
+        digest = file_checksum(filename)
+    return os.path.abspath(filename), stat.st_size, stat.st_mtime_ns, digest
+
+
+def read_cache(cachefile, kind, stamp, use_mmap=False):
+    """ Read the sections of a cache file as dictionary tag -> bytes
+
+    Returns None if the cache file does not exist, is of another kind or
+    was not created from the input file described by stamp. With use_mmap
+    the cache file is memory-mapped and the sections are memoryviews of it.
+    """
+    if not os.path.isfile(cachefile):
+        return None
+    path, size, mtime, digest = stamp
+    with open(cachefile, 'rb') as infile:
+        if use_mmap and os.path.getsize(cachefile) > 0:
+            # the map stays open as long as a view of it is used
+            data = memoryview(mmap.mmap(infile.fileno(), 0, access=mmap.ACCESS_READ))
+        else:
+            data = infile.read()
+    if len(data) < _header.size:
+        return None
+    magic, version, cache_kind, cache_size, cache_mtime, path_len, cache_digest = \
+        _header.unpack_from(data, 0)
+    if magic != cache_magic or version != cache_version or cache_kind != kind:
+        return None
+    pos = _header.size
+    cache_path = bytes(data[pos:pos + path_len]).decode()
+    pos += path_len
+    if cache_path != path or cache_size != size or cache_mtime != mtime:
+        return None
+    if digest is not None and cache_digest != digest:
+        return None
+    sections = {}
+    while pos + _section.size <= len(data):
+        tag, padding, length = _section.unpack_from(data, pos)
+        pos += _section.size + padding
+        sections[tag] = data[pos:pos + length]
+        pos += length
+    return sections
+
+
+def write_cache(cachefile, kind, stamp, sections):
+    """ Write the sections (dictionary tag -> bytes) into the cache file
+
+    A missing cache directory is created. Returns False if the cache file
+    can not be written, e.g. in a read-only directory.
+    """
+    path, size, mtime, digest = stamp
+    path_bytes = path.encode()
+    tmpfile = "{}.{}.tmp".format(cachefile, os.getpid())
+    try:
+        os.makedirs(os.path.dirname(os.path.abspath(cachefile)), exist_ok=True)
+        with open(tmpfile, 'wb') as outfile:
+            outfile.write(_header.pack(cache_magic, cache_version, kind, size, mtime,
+                                       len(path_bytes), digest or bytes(20)))
+            outfile.write(path_bytes)
+            pos = _header.size + len(path_bytes)
+            for tag in sections:
+                padding = -(pos + _section.size) % _align
+                outfile.write(_section.pack(tag, padding, len(sections[tag])))
+                outfile.write(bytes(padding))
+                outfile.write(sections[tag])
+                pos += _section.size + padding + len(sections[tag])
+        # replace in one step, a concurrent run never sees a partial cache
+        os.replace(tmpfile, cachefile)
+    except OSError:
+        if os.path.exists(tmpfile):
+            os.remove(tmpfile)
+        return False
+    return True
+
+
+def pack_array(typecode, values):
+    """ Values as little-endian bytes of an array
+    """
+    a = array.array(typecode, values)
+    if sys.byteorder != 'little':
+        a.byteswap()
+    return a.tobytes()
+
+
+def unpack_array(typecode, data):
+    a = array.array(typecode)
+    a.frombytes(data)
+    if sys.byteorder != 'little':
+        a.byteswap()
+    return a
+
+
+def view_array(typecode, data):
+    """ Values of an array without copying them if possible
+
+    data is a memoryview of a memory-mapped cache file (see read_cache()).
+    """
+    if sys.byteorder == 'little' and isinstance(data, memoryview):
+        return data.cast(typecode)
+    return unpack_array(typecode, data)
+
+
+class Loaded(object):
+    """ Data loaded in this process by cache file, only the last max_items are kept
+
+    The data is valid only for the input file with the same stamp (see
+    source_stamp()).
+    """
+
+    def __init__(self, max_items=1):
+        self.max_items = max_items
+        self._items = OrderedDict()
+
+    def get(self, cachefile, stamp):
+        """ Data loaded for the cache file, None if not loaded or stale
+        """
+        if cachefile not in self._items or self._items[cachefile][0] != stamp:
+            return None
+        self._items.move_to_end(cachefile)
+        return self._items[cachefile][1]
+
+    def put(self, cachefile, stamp, data):
+        """ Keep the data, the data used least recently is released
+        """
+        self._items.pop(cachefile, None)
+        self._items[cachefile] = (stamp, data)
+        while len(self._items) > self.max_items:
+            self._items.popitem(last=False)
+
+    def clear(self):
+        self._items.clear()
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""Open input and output files of the PySSRstat programs
+
+Input files compressed with gzip or bgzip (e.g. file.misa.gz) are
+decompressed on the fly while reading, they do not have to be unpacked
+before. Compressed files are recognised by their content, not by the name.
+The gzip module is imported only for compressed files.
+
+The file name - stands for standard input or standard output, so the
+programs can be piped, e.g.
+
+    ssrsearch.py seq.fasta -o - | filterrepeatsmisa.py - 30 200 repeat -o - | getsequences.py - seq.fasta
+
+Author: Mario Nenno
+Version: 2015-08-31
+Copyright: see file LICENCE.txt
+
+"""
+import io
+import sys
+
+# first two bytes of each gzip and bgzip file
+gzip_magic = b'\x1f\x8b'
+
+# file name of standard input and standard output
+stdio_name = '-'
+
+
+def is_stdio(filename):
+    return filename == stdio_name
+
+
+def is_gzip(filename):
+    if is_stdio(filename):
+        return _stdin().peek(2)[:2] == gzip_magic
+    with open(filename, 'rb') as infile:
+        return infile.read(2) == gzip_magic
+
+
+# binary standard input, one reader so the bytes looked at by is_gzip() are not lost
+_stdio = {}
+
+
+def _stdin():
+    """ Reader of standard input, closing it does not close standard input
+    """
+    if 'stdin' not in _stdio or _stdio['stdin'].closed:
+        _stdio['stdin'] = open(sys.stdin.fileno(), 'rb', closefd=False)
+    return _stdio['stdin']
+
+
+def open_text(filename):
+    """ Open an input file for reading lines of text, - for standard input
+    """
+    if is_gzip(filename):
+        import gzip
+        return gzip.open(_stdin() if is_stdio(filename) else filename, 'rt')
+    if is_stdio(filename):
+        return io.TextIOWrapper(_stdin())
+    return open(filename, 'r')
+
+
+def open_binary(filename):
+    """ Open an input file for reading bytes, - for standard input
+    """
+    if is_gzip(filename):
+        import gzip
+        return gzip.open(_stdin() if is_stdio(filename) else filename, 'rb')
+    if is_stdio(filename):
+        return _stdin()
+    return open(filename, 'rb')
+
+
+def open_output(filename, mode='w', **kwargs):
+    """ Open an output file for writing, - for standard output
+
+    Standard output is not closed with the returned file.
+    """
+    if is_stdio(filename):
+        # text written before by print() comes first
+        sys.stdout.flush()
+        return open(sys.stdout.fileno(), mode, closefd=False, **kwargs)
+    return open(filename, mode, **kwargs)
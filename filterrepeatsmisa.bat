@@ -1 +1 @@
-python %~dp0filterrepeatsmisa.py %1 %2 %3 %4 %5
\ No newline at end of file
+python %~dp0filterrepeatsmisa.py %*
\ No newline at end of file
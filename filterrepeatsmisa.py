@@ -2,10 +2,40 @@
 """Filter the MISA file by minimum and maximum repeat length
 
 Usage:
-filterrepeatsmisa.py <MISA-file> <min> <max> <sortmode>
+filterrepeatsmisa.py <MISA-file> <min> <max> <sortmode> [-i] [-t types] [-m motifs] [-mc classes]
+                     [-p from to] [-ed n -db db-file] [-a file] [-d file]
+                     [-r min-max,...] [-fc filter-config] [-mm MB] [-o output-file] [-of prefix]
+
+All criteria are evaluated at once over the columns of the MISA-file
+(see misafilter.py). With -r and -fc further filters are applied in the
+same pass, each written to its own output file, named with the prefix of
+-of (default filtered-repeats-sequence-list).
+
+With - as MISA-file it is read from standard input block by block, the
+SSRs found are sorted with bounded memory (see extsort.py), so the memory
+does not grow with the MISA-file. The SSRs of a sequence must be
+consecutive, like in the MISA-files of MISA. With -o - the output is written to
+standard output, e.g. to pipe it into getsequences.py.
+
+A filter config has a section for each named filter, e.g.
+
+    [short]
+    min = 20
+    max = 30
+
+    [long-tri]
+    min = 60
+    max = 200
+    sortmode = motif
+    ssrtypes = p3
+
+Further keys are motifs, motifclasses, position (from-to), enddistance
+(needs -db), allow and deny (files of sequence ids), like the options.
 
 Output:
-filtered-repeats-sequence-list.txt
+filtered-repeats-sequence-list.txt (or the file of -o)
+<prefix>-<min>-<max>.txt (for each range of -r)
+<prefix>-<name>.txt (for each filter of -fc)
 
 Author: Mario Nenno
 Version: 2015-08-31
@@ -17,115 +47,388 @@ import os
 import sys
 import time
 import argparse
+import configparser
+
+import fastaindex
+import fileio
+import misacache
+import misafilter
 
 # program version
 _version_ = '1.0'
 
 # output file
 out_filename = 'filtered-repeats-sequence-list.txt'
+# output file of a named filter or a range, by prefix and name
+out_filename_filter = '{}-{}.txt'
+out_prefix_filter = 'filtered-repeats-sequence-list'
+
+# how the SSRs can be sorted
+sort_modes = ['motif', 'repeat']
+
+# estimated memory used by one SSR while sorting, for the memory limit
+bytes_per_row = 100
+
+# lines of a MISA-file from standard input read at once, also the SSRs sorted in memory by default
+block_lines = 100000
+
+# all meres in order of output, and their SSR type
+all_meres = ['Mono', 'Di', 'Tri', 'Tetra', 'Penta', 'Hexa', 'Septa', 'Octa', 'Nona', 'Deca', 'combined', 'compound']
+ssrtype2mere = {'p1': 'Mono', 'p2': 'Di', 'p3': 'Tri', 'p4': 'Tetra', 'p5': 'Penta', 'p6': 'Hexa',
+                'p7': 'Septa', 'p8': 'Octa', 'p9': 'Nona', 'p10': 'Deca', 'c': 'combined', 'c*': 'compound'}
+
+
+def valid_ssrtypes(ssrtypes, imperfect):
+    """ SSR types to filter, by default the types of the default meres
+    """
+    if ssrtypes is None:
+        ssrtypes = ['p2', 'p3', 'p4', 'p5', 'p6']
+        if imperfect:
+            ssrtypes.append('c')
+    for ssrtype in ssrtypes:
+        if ssrtype not in ssrtype2mere:
+            raise ValueError("Unknown SSR type '{}'".format(ssrtype))
+    return ssrtypes
+
+
+def filter_criteria(minlength, maxlength, criteria, imperfect=False):
+    """ All criteria of a filter for misafilter.select()
+    """
+    criteria = dict(criteria or {})
+    criteria['ssrtypes'] = valid_ssrtypes(criteria.get('ssrtypes'), imperfect)
+    criteria['size'] = (minlength, maxlength)
+    return criteria
 
-meres = ['Di', 'Tri', 'Tetra', 'Penta', 'Hexa']
 
+def getsequencelines(filename, minlength, maxlength, criteria=None, imperfect=False):
+    """ SSRs of the MISA-file with a length from minlength to maxlength grouped by mere
 
-def getsequencelines(filename, minlength, maxlength):
-    validssrtypes = ['p2', 'p3', 'p4', 'p5', 'p6']
-    if args.imperfect:
-        validssrtypes.append('c')
+    criteria are further criteria of misafilter.select(), by default only
+    the SSR types of the default meres are selected (with imperfect also c).
+    """
+    # columns of the MISA file, from its cache if fresh
+    table = misacache.load_misa(filename)
+    mask = misafilter.select(table, **filter_criteria(minlength, maxlength, criteria, imperfect))
+    return groupbymere(table, mask)
 
-    ssrtype2mere = {'p2': 'Di', 'p3': 'Tri',  'p4': 'Tetra', 'p5': 'Penta', 'p6': 'Hexa'}
-    if args.imperfect:
-        ssrtype2mere['c'] = 'combined'
 
+def getsequencelines_filters(filename, filters, imperfect=False):
+    """ Table of the MISA-file and the mask of the selected SSRs of each filter
+
+    All filters are applied in one pass over the MISA-file. Each filter is
+    a dictionary with min, max and criteria (see main()).
+    """
+    table = misacache.load_misa(filename)
+    masks = misafilter.select_many(table, [filter_criteria(f['min'], f['max'], f['criteria'], imperfect)
+                                           for f in filters])
+    return table, masks
+
+
+def groupbymere(table, mask):
+    """ Selected SSRs of the table as items of a MISA line grouped by mere
+    """
     groupedseqlines = {}
-    with open(filename, "r") as infile:
-        for line in infile:
-            line = line.rstrip()
-            items = line.split("\t")
-            #        ID	    SSR nr.	SSR type SSR	size	start	end
-            #     ['PK14952.1', '1', 'p1', '(T)11', '11', '2418', '2428\n']
-            #  Idx  0            1    2      3       4     5
-            ssrtype = items[2]
-            if ssrtype in validssrtypes:
-                mere = ssrtype2mere[ssrtype]
-                repeatlen = int(items[4])
-                # search SSR in list of longest grouped by mere
-                if minlength <= repeatlen <= maxlength:
-                    # print(items)
-                    if mere in groupedseqlines.keys():
-                        listlines = groupedseqlines[mere]
-                        listlines.append(items)
-                        groupedseqlines[mere] = listlines
-                    else:
-                        listlines = []
-                        listlines.append(items)
-                        groupedseqlines[mere] = listlines
-        return groupedseqlines
-
-
-def printgroupedseqlines(grouped, misafile, execution_time, minlength, maxlength, sortmode):
-    with open(out_filename, 'w') as outfile:
+    for i in misafilter.selected_rows(mask):
+        mere = ssrtype2mere[table.ssrtypes[table.ssrtype[i]]]
+        #        ID	    SSR nr.	SSR type SSR	size	start	end
+        #     ['PK14952.1', '1', 'p1', '(T)11', '11', '2418', '2428']
+        #  Idx  0            1    2      3       4     5
+        items = table.items(i)
+        if mere in groupedseqlines.keys():
+            listlines = groupedseqlines[mere]
+            listlines.append(items)
+            groupedseqlines[mere] = listlines
+        else:
+            listlines = []
+            listlines.append(items)
+            groupedseqlines[mere] = listlines
+    return groupedseqlines
+
+
+def criteria_text(criteria):
+    """ Description of the further criteria for the header of the output
+    """
+    texts = []
+    if criteria.get('ssrtypes') is not None:
+        texts.append("SSR types: {}".format(",".join(criteria['ssrtypes'])))
+    if criteria.get('motifs') is not None:
+        texts.append("motifs: {}".format(",".join(criteria['motifs'])))
+    if criteria.get('motif_classes') is not None:
+        texts.append("motif classes: {}".format(",".join(criteria['motif_classes'])))
+    if criteria.get('position') is not None:
+        texts.append("position: {}-{}".format(*criteria['position']))
+    if criteria.get('end_distance') is not None:
+        texts.append("distance to sequence ends: {}".format(criteria['end_distance']))
+    if criteria.get('allow') is not None:
+        texts.append("allowed sequences: {}".format(len(criteria['allow'])))
+    if criteria.get('deny') is not None:
+        texts.append("denied sequences: {}".format(len(criteria['deny'])))
+    return "; ".join(texts)
+
+
+def mereorder(table):
+    """ Position in the output of the mere of each code of ssr type
+    """
+    return [all_meres.index(ssrtype2mere[t]) if t in ssrtype2mere else len(all_meres) for t in table.ssrtypes]
+
+
+def sortedrows(table, mask, sortmode, max_rows=None):
+    """ Selected rows of the table in order of output
+
+    By mere for sortmode 'motif', by repeat length and mere for 'repeat'. Rows
+    of equal key keep the order of the MISA-file. With max_rows at most
+    max_rows rows are sorted in memory (see extsort.py).
+    """
+    # imported when needed, so the program starts faster
+    import extsort
+    code2order = mereorder(table)
+    ssrtype = table.ssrtype
+    size = table.size
+    if "motif" == sortmode:
+        def key(i):
+            return code2order[ssrtype[i]]
+    else:
+        def key(i):
+            return size[i], code2order[ssrtype[i]]
+    return extsort.sort(misafilter.selected_rows(mask), key=key, max_items=max_rows)
+
+
+def items_key(sortmode):
+    """ Key of the items of a MISA line for the order of output, like sortedrows()
+    """
+    order = dict((t, all_meres.index(mere)) for t, mere in ssrtype2mere.items())
+    if "motif" == sortmode:
+        def key(items):
+            return order.get(items[2], len(all_meres))
+    else:
+        def key(items):
+            return int(items[4]), order.get(items[2], len(all_meres))
+    return key
+
+
+def count_repeats(seq_counts, rows):
+    """ Count the SSRs of each sequence
+
+    rows are the selected SSRs as (sequence, order of the mere, row number),
+    seq_counts a dictionary sequence -> [number of SSRs, (order, row number)
+    of the first SSR in the output].
+    """
+    for seq, order, i in rows:
+        if seq in seq_counts:
+            counts = seq_counts[seq]
+            counts[0] += 1
+            # a later row of a mere of lower order comes first in the output
+            if order < counts[1][0]:
+                counts[1] = (order, i)
+        else:
+            seq_counts[seq] = [1, (order, i)]
+
+
+def sequences_multirepeats(seq_counts):
+    """ Sequences with multiple SSRs as list of (number of SSRs, sequence) in order of their first SSR
+    """
+    multi = [seq for seq in seq_counts if seq_counts[seq][0] > 1]
+    multi.sort(key=lambda seq: seq_counts[seq][1])
+    return [(seq_counts[seq][0], seq) for seq in multi]
+
+
+def multirepeats(table, mask):
+    """ Sequences with multiple selected SSRs as list of (number of SSRs, sequence id)
+
+    The sequences are in order of their first SSR grouped by mere.
+    """
+    code2order = mereorder(table)
+    seq_counts = {}
+    count_repeats(seq_counts, ((table.seq[i], code2order[table.ssrtype[i]], i)
+                               for i in misafilter.selected_rows(mask)))
+    return [(num, table.seqids[seq]) for num, seq in sequences_multirepeats(seq_counts)]
+
+
+def count_consecutive(state, multi, rows):
+    """ Count the SSRs of sequences whose SSRs are consecutive, like in a MISA-file
+
+    rows are like in count_repeats(), state is [sequence, number of SSRs,
+    (order, row number) of the first SSR in the output] of the last
+    sequence. The sequences with multiple SSRs are added to the sorter multi
+    as ((order, row number), number of SSRs, sequence).
+    """
+    for seq, order, i in rows:
+        if seq == state[0]:
+            state[1] += 1
+            # a later row of a mere of lower order comes first in the output
+            if order < state[2][0]:
+                state[2] = (order, i)
+        else:
+            if state[1] > 1:
+                multi.extend([(state[2], state[1], state[0])])
+            state[:] = [seq, 1, (order, i)]
+
+
+def getsequencelines_blocks(filename, filters, imperfect=False, max_rows=None):
+    """ Selected SSRs of each filter, reading the MISA-file block by block
+
+    Only one block of the MISA-file is in memory, the selected SSRs and the
+    sequences with multiple SSRs are sorted with at most max_rows in memory
+    (see extsort.py). Returns for each filter an iterator over the items of
+    the selected SSRs in order of output and one over the sequences with
+    multiple SSRs, see multirepeats().
+    """
+    # imported when needed, so the program starts faster
+    import extsort
+    all_criteria = [filter_criteria(f['min'], f['max'], f['criteria'], imperfect) for f in filters]
+    sorters = [extsort.Sorter(key=items_key(f['sortmode']), max_items=max_rows) for f in filters]
+    multi_sorters = [extsort.Sorter(key=lambda value: value[0], max_items=max_rows) for f in filters]
+    states = [[None, 0, None] for f in filters]
+    offset = 0
+    for table in misacache.read_blocks(filename, block_lines):
+        code2order = mereorder(table)
+        masks = misafilter.select_many(table, all_criteria)
+        for mask, sorter, multi, state in zip(masks, sorters, multi_sorters, states):
+            rows = list(misafilter.selected_rows(mask))
+            sorter.extend(table.items(i) for i in rows)
+            count_consecutive(state, multi, ((table.seqids[table.seq[i]], code2order[table.ssrtype[i]], offset + i)
+                                             for i in rows))
+        offset += len(table)
+    results = []
+    for sorter, multi, state in zip(sorters, multi_sorters, states):
+        # the last sequence
+        count_consecutive(state, multi, [(None, 0, 0)])
+        results.append((sorter.sorted(), ((num, seq) for first, num, seq in multi.sorted())))
+    return results
+
+
+def printgroupedseqlines(table, mask, misafile, execution_time, minlength, maxlength, sortmode, criteria=None,
+                         outname=out_filename, max_rows=None, imperfect=False):
+    rows = (table.items(i) for i in sortedrows(table, mask, sortmode, max_rows))
+    printseqlines(rows, multirepeats(table, mask), misafile, execution_time, minlength, maxlength, sortmode,
+                  criteria, outname, imperfect)
+
+
+def printseqlines(rows, multi, misafile, execution_time, minlength, maxlength, sortmode, criteria=None,
+                  outname=out_filename, imperfect=False):
+    """ Write the items of the selected SSRs in order of output and the sequences with multiple SSRs
+    """
+    with fileio.open_output(outname) as outfile:
         outfile.write("Program: {} {}\n".format(os.path.basename(sys.argv[0]), _version_))
         outfile.write("Date: {} Execution time: {:.2f} sec\n".format(time.strftime("%Y-%m-%d %H:%M"), execution_time))
         outfile.write("Input file of sequences: {}\n".format(misafile))
         outfile.write("Repeat length min: {}, max: {}, sort sequence by: {} length\n".format(
             minlength, maxlength, sortmode))
-        outfile.write("Output: {} Execution time: {:.2f} sec\n".format(out_filename, execution_time))
+        if criteria:
+            outfile.write("Criteria: {}\n".format(criteria_text(criteria)))
+        outfile.write("Output: {} Execution time: {:.2f} sec\n".format(outname, execution_time))
         outfile.write("="*70 + "\n")
         # --- item structure
         #     ['PK14952.1', '1', 'p1', '(T)11', '11', '2418', '2428\n']
         #  Idx  0            1    2      3       4     5       6
 
-        # copy into a new list without grouping by mere
-        listofall = []
-        for mere in meres:
-            if mere in grouped.keys():
-                for items in grouped[mere]:
-                    listofall.append(items)
-
-        # find sequences with multiple SSR repeats
-        seqwithmultirepeats = {}
-        for items in listofall:
-            seqid = items[0]
-            if seqid in seqwithmultirepeats.keys():
-                num = seqwithmultirepeats[seqid]
-                num += 1
-                seqwithmultirepeats[seqid] = num
-            else:
-                seqwithmultirepeats[seqid] = 1
+        # meres of the filtered SSR types in order of output
+        ssrtypes = valid_ssrtypes((criteria or {}).get('ssrtypes'), imperfect)
+        output_meres = [mere for mere in all_meres if mere in set(ssrtype2mere[t] for t in ssrtypes)]
 
         seqlineformat = "{:12} {}: {}\n"
         if "motif" == sortmode:
-            for mere in meres:
+            # the rows are sorted by mere, write the header of each mere before its rows
+            mere_idx = dict((mere, idx) for idx, mere in enumerate(output_meres))
+            last_idx = -1
+            for items in rows:
+                idx = mere_idx[ssrtype2mere[items[2]]]
+                while last_idx < idx:
+                    last_idx += 1
+                    outfile.write("----- {}\n".format(output_meres[last_idx]))
+                seqline = seqlineformat.format(items[3], items[4], items[0])
+                outfile.write(seqline)
+            for mere in output_meres[last_idx + 1:]:
                 outfile.write("----- {}\n".format(mere))
-                if mere in grouped.keys():
-                    # print(mere, grouped[mere])
-                    for items in grouped[mere]:
-                        seqline = seqlineformat.format(items[3], items[4], items[0])
-                        outfile.write(seqline)
         elif "repeat" == sortmode:
-            # print("contains %d" % len(listofall))
-            # to sort by length loop over range
-            for l in range(minlength, maxlength+1):
-                for items in listofall:
-                    repeatlength = int(items[4])
-                    if l == repeatlength:
-                        seqline = "\t".join(items)+"\n"
-                        outfile.write(seqline)
-        if len(seqwithmultirepeats) > 0:
-            found = 0
-            for seq in seqwithmultirepeats:
-                if seqwithmultirepeats[seq] > 1:
-                    found += 1
-                    if found == 1:
-                        outfile.write("\n----- Sequences with multiple repeats -----\n")
-                    outfile.write("{}: {}\n".format(seqwithmultirepeats[seq], seq))
-
-
-def main(misafile, min_length, max_length, sortmode):
-    # if optional arguments imperfect, add the combined mere to the list of meres
-    if args.imperfect:
-        meres.append('combined')
+            # sorted by length, rows of equal length in order of mere
+            for items in rows:
+                seqline = "\t".join(items)+"\n"
+                outfile.write(seqline)
+        found = 0
+        for num, seq in multi:
+            found += 1
+            if found == 1:
+                outfile.write("\n----- Sequences with multiple repeats -----\n")
+            outfile.write("{}: {}\n".format(num, seq))
+
+
+def parse_range(text):
+    """ Range of repeat length 'min-max' as tuple of int
+    """
+    try:
+        minlength, maxlength = text.split("-")
+        return int(minlength), int(maxlength)
+    except ValueError:
+        raise ValueError("Invalid range '{}', expected min-max".format(text))
+
+
+def parse_criteria(options, seq_lengths=None):
+    """ Criteria of misafilter.select() from options given as text (command line or filter config)
+    """
+    criteria = {}
+    if options.get('ssrtypes'):
+        criteria['ssrtypes'] = options['ssrtypes'].split(",")
+    if options.get('motifs'):
+        criteria['motifs'] = options['motifs'].split(",")
+    if options.get('motifclasses'):
+        criteria['motif_classes'] = options['motifclasses'].split(",")
+    if options.get('position'):
+        criteria['position'] = parse_range(options['position'])
+    if options.get('enddistance') not in (None, ''):
+        if seq_lengths is None:
+            raise ValueError("Distance to sequence ends needs the db file (-db)")
+        criteria['end_distance'] = int(options['enddistance'])
+        criteria['seq_lengths'] = seq_lengths
+    if options.get('allow'):
+        criteria['allow'] = misafilter.read_ids(options['allow'])
+    if options.get('deny'):
+        criteria['deny'] = misafilter.read_ids(options['deny'])
+    return criteria
+
+
+def read_filters(filename, sortmode, criteria, seq_lengths=None, prefix=out_prefix_filter):
+    """ Named filters of a filter config, each section is a filter
 
+    Criteria not given in a section are taken from criteria (command line).
+    The output file of a filter is <prefix>-<name>.txt.
+    """
+    config = configparser.ConfigParser()
+    with open(filename) as infile:
+        config.read_file(infile)
+    filters = []
+    for name in config.sections():
+        section = config[name]
+        if 'min' not in section or 'max' not in section:
+            raise ValueError("Filter '{}' in '{}' needs min and max".format(name, filename))
+        filter_sortmode = section.get('sortmode', sortmode)
+        if filter_sortmode not in sort_modes:
+            raise ValueError("Filter '{}' in '{}' has sortmode '{}', not one of {}".format(
+                name, filename, filter_sortmode, ", ".join(sort_modes)))
+        filter_crit = dict(criteria)
+        filter_crit.update(parse_criteria(section, seq_lengths))
+        filters.append({'min': int(section['min']), 'max': int(section['max']),
+                        'sortmode': filter_sortmode, 'criteria': filter_crit,
+                        'outfile': out_filename_filter.format(prefix, name)})
+    return filters
+
+
+def main(misafile, min_length, max_length, sortmode, criteria=None, ranges=None, filters=None, max_memory=None,
+         imperfect=False, outname=out_filename, outprefix=out_prefix_filter):
+    """ Filter the MISA-file by the range min_length to max_length
+
+    ranges is a list of further ranges (min, max) and filters a list of
+    named filters (see read_filters()), all of them are applied in the same
+    pass over the MISA-file. With max_memory (MB) larger sets of SSRs are
+    sorted on disk. With imperfect the SSRs of type c are included by
+    default. The output of min_length to max_length is written to outname,
+    - for standard output, the output of a range to
+    <outprefix>-<min>-<max>.txt. Returns the table of the MISA-file and the
+    mask of each filter, the first one of min_length to max_length.
+
+    A MISA-file from standard input (-) is read block by block and not
+    kept, then None is returned for the table and the masks.
+    """
     # Start timing
     start_time = time.time()
 
@@ -133,23 +436,83 @@ def main(misafile, min_length, max_length, sortmode):
     minlength = int(min_length)
     maxlength = int(max_length)
 
-    # filter the file for minimum and maximum length
-    groupedseqlines = getsequencelines(misafile, minlength, maxlength)
+    all_filters = [{'min': minlength, 'max': maxlength, 'sortmode': sortmode, 'criteria': criteria,
+                    'outfile': outname}]
+    for range_min, range_max in ranges or []:
+        all_filters.append({'min': range_min, 'max': range_max, 'sortmode': sortmode,
+                            'criteria': criteria,
+                            'outfile': out_filename_filter.format(outprefix, "{}-{}".format(range_min, range_max))})
+    all_filters.extend(filters or [])
+
+    # rows sorted in memory, more rows are sorted on disk
+    max_rows = None
+    if max_memory is not None:
+        max_rows = max(1, max_memory * 2**20 // bytes_per_row)
+
+    if fileio.is_stdio(misafile):
+        # streaming, the memory does not grow with the MISA-file
+        results = getsequencelines_blocks(misafile, all_filters, imperfect, max_rows or block_lines)
+        execution_time = time.time() - start_time
+        for f, (rows, multi) in zip(all_filters, results):
+            printseqlines(rows, multi, misafile, execution_time, f['min'], f['max'], f['sortmode'],
+                          f['criteria'], f['outfile'], imperfect)
+        return None, None
+
+    # filter the file for minimum and maximum length of each filter
+    table, masks = getsequencelines_filters(misafile, all_filters, imperfect)
 
     # End timing
     execution_time = time.time() - start_time
 
     # write results to output
-    printgroupedseqlines(groupedseqlines, misafile, execution_time, minlength, maxlength, sortmode)
+    for f, mask in zip(all_filters, masks):
+        printgroupedseqlines(table, mask, misafile, execution_time, f['min'], f['max'], f['sortmode'],
+                             f['criteria'], f['outfile'], max_rows, imperfect)
+    return table, masks
 
 
 if __name__ == '__main__':
     parser = argparse.ArgumentParser()
-    parser.add_argument("misafile", help="file with sequences and repeats")
+    parser.add_argument("misafile", help="file with sequences and repeats, - for standard input")
     parser.add_argument("min", help="minimum length of repeat")
     parser.add_argument("max", help="maximum length of repeat")
-    parser.add_argument("sortmode", help="how to sort the sequences", choices=['motif', 'repeat'])
+    parser.add_argument("sortmode", help="how to sort the sequences", choices=sort_modes)
     parser.add_argument("-i", "--imperfect", help="include imperfect SSRs", action="store_true")
+    parser.add_argument("-t", "--ssrtypes", help="SSR types, comma separated, e.g. p2,p3,c")
+    parser.add_argument("-m", "--motifs", help="motifs, comma separated, e.g. AC,AG")
+    parser.add_argument("-mc", "--motifclasses", help="motif classes, comma separated, e.g. AC/GT,AAT/ATT")
+    parser.add_argument("-p", "--position", help="region of the sequence with the SSR", nargs=2, type=int,
+                        metavar=("FROM", "TO"))
+    parser.add_argument("-ed", "--enddistance", help="minimum distance of the SSR to the sequence ends", type=int)
+    parser.add_argument("-db", "--dbfile", help="db file with the sequences, needed for -ed")
+    parser.add_argument("-a", "--allow", help="file with the ids of the sequences to keep")
+    parser.add_argument("-d", "--deny", help="file with the ids of the sequences to skip")
+    parser.add_argument("-r", "--ranges", help="further ranges of repeat length, e.g. 20-30,30-60")
+    parser.add_argument("-fc", "--filterconfig", help="file with further named filters")
+    parser.add_argument("-mm", "--maxmemory", help="memory in MB for sorting, more SSRs are sorted on disk",
+                        type=int)
+    parser.add_argument("-o", "--out", help="output file, - for standard output (default {})".format(out_filename),
+                        default=out_filename)
+    parser.add_argument("-of", "--outfilters", help="prefix of the output files of -r and -fc (default {})".format(
+        out_prefix_filter), default=out_prefix_filter)
     args = parser.parse_args()
+    seq_lengths = None
+    if args.dbfile:
+        index = fastaindex.load_index(args.dbfile)
+        seq_lengths = dict((seq_id, index[seq_id][0]) for seq_id in index)
+    options = {'ssrtypes': args.ssrtypes, 'motifs': args.motifs, 'motifclasses': args.motifclasses,
+               'enddistance': args.enddistance, 'allow': args.allow, 'deny': args.deny}
+    try:
+        criteria = parse_criteria(options, seq_lengths)
+        if args.position:
+            # already two numbers, not parsed from text like in a filter config
+            criteria['position'] = tuple(args.position)
+        ranges = [parse_range(text) for text in args.ranges.split(",")] if args.ranges else []
+        filters = []
+        if args.filterconfig:
+            filters = read_filters(args.filterconfig, args.sortmode, criteria, seq_lengths, args.outfilters)
+    except ValueError as e:
+        parser.error(str(e))
     if args.misafile and args.min and args.max and args.sortmode:
-        main(args.misafile, args.min, args.max, args.sortmode)
\ No newline at end of file
+        main(args.misafile, args.min, args.max, args.sortmode, criteria, ranges, filters, args.maxmemory,
+             args.imperfect, args.out, args.outfilters)
\ No newline at end of file
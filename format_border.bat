@@ -1 +1 @@
-python %~dp0format_border.py %1 %2 %3
\ No newline at end of file
+python %~dp0format_border.py %*
\ No newline at end of file
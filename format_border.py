@@ -4,7 +4,10 @@
 With the optional parameter -idt or --idtrunc the id (position 0) can be
 truncated at the first underscore character
 
-Usage: format_border.py border.txt tab|space [-idt|--idtrunc]
+The border file is read and written line by line, with - from standard
+input, and with -o - to standard output.
+
+Usage: format_border.py border.txt tab|space [-idt|--idtrunc] [-o|--out <output-file>]
 
 Example of line in border.txt
 
@@ -18,17 +21,27 @@ import sys
 import time
 import argparse
 
+import fileio
+
+
+def main(borderfile, delimiter, idtrunc, outname=None):
+    """ Write the border file formatted, returns the number of repeats
 
-def main(borderfile, delimiter, idtrunc):
+    outname is the output file, - for standard output, by default
+    border-space.txt or border-tab.txt.
+    """
+    num_repeats = 0
     if 'space' == delimiter:
         out_filename = 'border-space.txt'
         line_format = "{0:<30} {1:>4} {2:>7} {3:>7}"
     else:
         out_filename = 'border-tab.txt'
         line_format = "{0}\t{1}\t{2}\t{3}"
+    if outname is None:
+        outname = out_filename
 
-    with open(borderfile, 'r') as borderfile:
-        with open(out_filename, 'w') as outfile:
+    with fileio.open_text(borderfile) as borderfile:
+        with fileio.open_output(outname) as outfile:
             for line in borderfile:
                 line = line.rstrip()
                 if "\t" in line:
@@ -42,14 +55,18 @@ def main(borderfile, delimiter, idtrunc):
                     line_formated = line_format.format(
                         seq_id, cols[3], cols[5], cols[6])
                     outfile.write(line_formated+"\n")
+                    num_repeats += 1
                 else:
                     outfile.write(line+"\n")
+    return num_repeats
 
 if __name__ == '__main__':
     parser = argparse.ArgumentParser()
-    parser.add_argument("borderfile", help="file with sequences and repeats")
+    parser.add_argument("borderfile", help="file with sequences and repeats, - for standard input")
     parser.add_argument("delimiter", help="how to sort the sequences", choices=['space', 'tab'])
     parser.add_argument("-idt", "--idtrunc", help="trunc id after underscore", action="store_true")
+    parser.add_argument("-o", "--out", help="output file, - for standard output "
+                        "(default border-space.txt or border-tab.txt)")
     args = parser.parse_args()
     if args.borderfile and args.delimiter:
-        main(args.borderfile, args.delimiter, args.idtrunc)
\ No newline at end of file
+        main(args.borderfile, args.delimiter, args.idtrunc, args.out)
\ No newline at end of file
@@ -1 +1 @@
-python %~dp0getsequences.py %1 %2 %3 %4 %5
\ No newline at end of file
+python %~dp0getsequences.py %*
\ No newline at end of file
@@ -3,15 +3,35 @@
 
 With the optional parameter for border-mode filter it extracts only sequences that have a 'border'
 of n bp up- and downstream of SSR and this border should not contain Ns
+All repeats of a sequence are checked, border.txt lists each repeat with border and
+the sequence is written once for all its repeats.
 
 Usage:
 getsequences.py repeats-sequence-list.txt <db-file> [-b|--border <border-length-in-bp>]
+                [-f|--flank <flank-length-in-bp>] [-s|--sweep [-ss|--sweepsteps <n,n,...>]] [-j|--jobs <n>]
+                [-cd|--cachedir <dir>] [-cs|--checksum] [-o|--out <output-file>]
+                [-ob|--outborder <border-file>] [-oi|--outinfo <summary-file>]
 
 Output:
-index.txt, repeats-sequences.fas
+<db-file>.fidx, repeats-sequences.fas
 
 or with optional parameter -b nnn
-index.txt, repeats-sequences-border.fas, border.txt
+<db-file>.fidx, repeats-sequences-border.fas, border.txt
+
+or with optional parameter -f nnn, each repeat with nnn bp up- and downstream
+<db-file>.fidx, repeats-flanks.fas (and border.txt with -b)
+
+or with optional parameter -s, for all border lengths in one pass
+<db-file>.fidx, border-sweep.txt (use sweepborder.py to get border.txt), with
+the number of repeats passing each border length of -ss
+
+The index cache <db-file>.fidx is rebuilt whenever the db file changed.
+
+With - as list file the repeats are read from standard input, e.g. from
+filterrepeatsmisa.py -o -. With -o the sequences (or the max borders with
+-s) are written to the given file, with -o - to standard output. -ob and
+-oi name the border file and the summary getsequences-info.txt, so several
+runs can write to one directory.
 
 
 Author: Mario Nenno
@@ -23,6 +43,10 @@ import os
 import sys
 import time
 import argparse
+import shutil
+
+import fastaindex
+import fileio
 
 # program version
 _version_ = '1.0'
@@ -32,205 +56,505 @@ out_filename_info = "getsequences-info.txt"
 out_filename_seq = "repeats-sequences.fas"
 out_filename_seq_border = "repeats-sequences-border.fas"
 out_filename_border = "border.txt"
+out_filename_sweep = "border-sweep.txt"
+
+# border lengths of the table of the sweep
+sweep_steps = [0, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000]
+out_filename_flanks = "repeats-flanks.fas"
 
 
-def readseqidfrominfile(filename, border):
+def readseqidfrominfile(filename, border, per_repeat):
+    """ Read the repeats of the list file
+
+    With per_repeat all repeats are kept, else only the first repeat of
+    each sequence.
+    """
+    return select_repeats(readrepeatlines(filename), border, per_repeat)
+
+
+def readrepeatlines(filename):
+    """ Items of the lines of repeats of the list file, e.g. the output of filterrepeatsmisa.py
+    """
+    # loop over list file and extract sequence ids
+    is_start = False
+    with fileio.open_text(filename) as fhseqids:
+        for line in fhseqids:
+            line = line.rstrip()
+            ll = len(line)
+            if line.startswith("====="):
+                is_start = True
+                continue
+            elif is_start and ll > 0:
+                # Id   SSR nr.  type SSR   size start end
+                # PK13324.1	1   p2	(TC)15	30	29	 58
+                # 0         1   2   3        4   5    6
+                # split by tab and use first element
+                yield line.split("\t")
+            elif is_start and ll == 0:
+                break
+        if fileio.is_stdio(filename):
+            # read the rest, e.g. the sequences with multiple repeats, so the program writing it is not blocked
+            for line in fhseqids:
+                pass
+
+
+def select_repeats(list_items, border, per_repeat):
+    """ Repeats to extract from the items of the repeats, see readseqidfrominfile()
+    """
     repeats = []
-    found_seqids = []
+    found_seqids = set()
     border_len = 0
     if border:
         border_len = int(border)
-    # read file with sequence ids in memory as list
-    fhseqids = open(filename, "r")
-    lines = fhseqids.readlines()
-    fhseqids.close()
-    # loop over list and extract sequence ids
-    is_start = False
-    linenum = 0
-    for line in lines:
-        linenum += 1
-        line = line.rstrip()
-        ll = len(line)
-        if line.startswith("====="):
-            is_start = True
-            continue
-        elif is_start and ll > 0:
-            # Id   SSR nr.  type SSR   size start end
-            # PK13324.1	1   p2	(TC)15	30	29	 58
-            # 0         1   2   3        4   5    6
-            # split by tab and use first element
-            items = line.split("\t")
-            # do not add duplicate sequence ids
+    for items in list_items:
+        # do not add duplicate sequence ids
+        if not per_repeat:
             if items[0] in found_seqids:
                 continue
-            else:
-                found_seqids.append(items[0])
-            # optionally, test star poisition (downstream border)
-            if border:
-                start = int(items[5])
-                if start >= border_len:
-                    repeats.append(items)
-            else:
+            found_seqids.add(items[0])
+        # optionally, test start position (upstream border)
+        if border:
+            start = int(items[5])
+            # start is 1-based, upstream are start-1 bases
+            if start > border_len:
                 repeats.append(items)
-        elif is_start and ll == 0:
-            # is_start = False
-            break
         else:
-            continue
+            repeats.append(items)
     return repeats
 
 
-def create_load_index(seq):
-    indexfile = "index.txt"
-    if not os.path.isfile(indexfile):
-        i = 0
-        with open(indexfile, "w") as file:
-            for line in seq:
-                i += 1
-                if line.startswith(">"):
-                    line = line.rstrip()
-                    # for compatibility change seq id like misa
-                    # replace space with underscore
-                    seq_id = line[1:].replace(' ', '_')
-                    file.write(seq_id + "\t" + str(i) + "\n")
-            # add end of last sequence
-            file.write("end"+"\t"+str(i+1)+"\n")
-    # load index
-    fo = open(indexfile, "r")
-    index = fo.readlines()
-    fo.close()
-    return index
-
-
-def extract_print_seq(accession_repeats, sequences, border, start_time):
-    # db file must be in fasta format
+def check_border(items, index, nruns, border_len):
+    """ Has the repeat a border of border_len bp up- and downstream without N?
+
+    The border is checked with the N runs of the index, the sequence is not read.
+    """
+    # Id   SSR nr.  type SSR   size start end
+    # PK13324.1	1   p2	(TC)15	30	29	 58
+    # 0         1   2   3        4   5    6
+    seq_id = items[0]
+    start_repeat = int(items[5])
+    end_repeat = int(items[6])
+    # --- check for N in border upstream
+    if nruns.has_n(seq_id, start_repeat - border_len - 1, start_repeat - 1):
+        return False
+    # --- check for boder downstream
+    # 1) size: rest >= border
+    rest_after_end = index[seq_id][0] - end_repeat
+    if rest_after_end < border_len:
+        return False
+    # 2) downstream border does not contain Ns?
+    return not nruns.has_n(seq_id, end_repeat, end_repeat + border_len)
+
+
+def print_border(repeats_border_ok, border, listfile, allseqfile, start_time, outname=out_filename_border):
+    # write the list of repeats in separate border file
+    num_repeats_border_ok = len(repeats_border_ok)
+    execution_time = time.time() - start_time
+    if num_repeats_border_ok > 0:
+        with fileio.open_output(outname) as border_file:
+            border_file.write("Program: {} {}\n".format(os.path.basename(sys.argv[0]), _version_))
+            border_file.write("Date: {} , duration: {:.2f} sec\n".format(time.strftime("%Y-%m-%d %H:%M"), execution_time))
+            border_file.write("Repeats file: {}\n".format(listfile))
+            border_file.write("Db file: {}\n".format(allseqfile))
+            border_file.write("{} repeats with border ({} bp)\n".format(num_repeats_border_ok, border))
+            border_file.write("=" * 80 + "\n")
+            for items in repeats_border_ok:
+                border_file.write("{}\n".format("\t".join(items)))
+
+
+def write_record(seq_file, header, sequence):
+    """ Write a FASTA record to the binary file, returns its number of bytes
+    """
+    record = ">{}\n".format(header).encode() + sequence + b"\n"
+    seq_file.write(record)
+    return len(record)
+
+
+def write_sequences(db, nruns, units, border_len, seq_file):
+    """ Check the repeats and write the sequences of a list of work units
+
+    A work unit is a tuple (seq_id, repeats) with the repeats of the sequence
+    as list of (i, items), i is the position in the list file. border_len is
+    None without border mode. Returns the positions of the repeats with
+    border, the number of repeats found and the records written as list of
+    (position in the list file, number of bytes).
+    """
+    repeats_ok = []
     num = 0
-    repeats_border_ok = []
-    border_len = 0
+    records = []
+    for seq_id, repeats in units:
+        if border_len is None:
+            # write to file
+            records.append((repeats[0][0], write_record(seq_file, seq_id, db.fetch(seq_id))))
+            num += 1
+        else:
+            # check all repeats of the sequence
+            is_seq_ok = False
+            for i, items in repeats:
+                if check_border(items, db.index, nruns, border_len):
+                    repeats_ok.append(i)
+                    is_seq_ok = True
+                    num += 1
+            # write the sequence once for all its repeats with border
+            if is_seq_ok:
+                records.append((repeats[0][0], write_record(seq_file, seq_id, db.fetch(seq_id))))
+    return repeats_ok, num, records
+
+
+def write_flanks(db, nruns, units, border_len, flank_len, seq_file):
+    """ Check the repeats and write the repeats with flanks of a list of work units
+
+    A work unit is a tuple (i, items) of a repeat, see write_sequences().
+    """
+    repeats_ok = []
+    num = 0
+    records = []
+    for i, items in units:
+        if border_len is not None:
+            if not check_border(items, db.index, nruns, border_len):
+                continue
+            repeats_ok.append(i)
+        # Id   SSR nr.  type SSR   size start end
+        # PK13324.1	1   p2	(TC)15	30	29	 58
+        # 0         1   2   3        4   5    6
+        seq_id = items[0]
+        start_repeat = int(items[5])
+        end_repeat = int(items[6])
+        # window with flanks, 1-based like the repeat, cut at the sequence ends
+        window_start = max(1, start_repeat - flank_len)
+        window_end = min(db.index[seq_id][0], end_repeat + flank_len)
+        header = "{}:{}-{} SSR {} {} {} {}-{}".format(
+            seq_id, window_start, window_end, items[1], items[2], items[3], start_repeat, end_repeat)
+        records.append((i, write_record(seq_file, header, db.fetch(seq_id, window_start - 1, window_end))))
+        num += 1
+    return repeats_ok, num, records
+
+
+def copy_records(parts, seq_file):
+    """ Copy the records of the parts to the output file in the order of the list file
+
+    parts is a list of (file, records) with the records of the file as
+    returned by write_sequences().
+    """
+    pieces = []
+    for part_file, records in parts:
+        pos = 0
+        for i, size in records:
+            pieces.append((i, part_file, pos, size))
+            pos += size
+    pieces.sort(key=lambda piece: piece[0])
+    for i, part_file, pos, size in pieces:
+        part_file.seek(pos)
+        seq_file.write(part_file.read(size))
+
+
+# state of a worker process: db file and N runs, opened once per process
+_worker = {}
+
+
+def _init_worker(dbfile, cachedir):
+    index, nruns = fastaindex.load_index_nruns(dbfile, cachedir)
+    _worker['db'] = fastaindex.SequenceFile(dbfile, index, cachedir)
+    _worker['nruns'] = nruns
+
+
+def _work(task):
+    """ Process a part of the work units in a worker process into a temporary file
+    """
+    import tempfile
+    write_function, units, params, tmpdir = task
+    fd, tmpname = tempfile.mkstemp(suffix='.fas', dir=tmpdir)
+    with os.fdopen(fd, "wb") as seq_file:
+        repeats_ok, num, records = write_function(_worker['db'], _worker['nruns'], units, *params,
+                                                  seq_file=seq_file)
+    return tmpname, repeats_ok, num, records
+
+
+def run_units(write_function, units, params, dbfile, index, nruns, cachedir, jobs, seq_file, reorder=False):
+    """ Process the work units with write_function, in parallel with jobs > 1
+
+    The units are processed in the given order, i.e. the order of the db
+    file so reads are sequential. With reorder the records are written in
+    the order of the list file: they are first written to temporary files and
+    copied from there. In parallel the units are split in consecutive parts,
+    the output is the same as in serial.
+    """
+    # temporary files next to the output file, for standard output in the temporary directory of the system
+    tmpdir = None
+    if isinstance(seq_file.name, str):
+        tmpdir = os.path.dirname(os.path.abspath(seq_file.name))
+    if jobs <= 1 or len(units) <= 1:
+        with fastaindex.SequenceFile(dbfile, index, cachedir) as db:
+            if not reorder:
+                return write_function(db, nruns, units, *params, seq_file=seq_file)[:2]
+            import tempfile
+            with tempfile.TemporaryFile(dir=tmpdir) as part_file:
+                repeats_ok, num, records = write_function(db, nruns, units, *params, seq_file=part_file)
+                copy_records([(part_file, records)], seq_file)
+            return repeats_ok, num
+    # imported only with worker processes, so the program starts faster
+    import multiprocessing
+    repeats_ok = []
+    num = 0
+    parts = []
+    # some parts more than workers to balance the load
+    num_parts = min(len(units), jobs * 4)
+    part_size = (len(units) + num_parts - 1) // num_parts
+    tasks = [(write_function, units[k:k + part_size], params, tmpdir) for k in range(0, len(units), part_size)]
+    try:
+        with multiprocessing.Pool(jobs, initializer=_init_worker, initargs=(dbfile, cachedir)) as pool:
+            for tmpname, part_repeats_ok, part_num, part_records in pool.imap(_work, tasks):
+                parts.append((tmpname, part_records))
+                repeats_ok.extend(part_repeats_ok)
+                num += part_num
+        if reorder:
+            part_files = [(open(tmpname, "rb"), records) for tmpname, records in parts]
+            try:
+                copy_records(part_files, seq_file)
+            finally:
+                for part_file, records in part_files:
+                    part_file.close()
+        else:
+            for tmpname, records in parts:
+                with open(tmpname, "rb") as part_file:
+                    shutil.copyfileobj(part_file, seq_file)
+    finally:
+        for tmpname, records in parts:
+            os.remove(tmpname)
+    return repeats_ok, num
+
+
+def extract_print_seq(accession_repeats, listfile, dbfile, index, nruns, border, cachedir, jobs, start_time,
+                      outfilename=None, outname_border=out_filename_border):
+    """ Write the sequences of the repeats, with border only of the repeats with border
+
+    The sequences are written in the order of the list file. outfilename is
+    the output file, - for standard output, by default repeats-sequences.fas
+    or repeats-sequences-border.fas, outname_border the border file.
+
+    Returns the number of repeats found and the repeats with border (None
+    without border).
+    """
+    # db file must be in fasta format
+    border_len = None
     if border:
         border_len = int(border)
     # switch filename with sequences
-    if border:
-        outfilename = out_filename_seq_border
-    else:
-        outfilename = out_filename_seq
-    with open(outfilename, "w") as seq_file:
-        # load/create index file for sequences
-        index = create_load_index(sequences)
-        # search for: PK13324.1
-        # in PK13324.1  1234
-        i = 0
-        for items in accession_repeats:
-            i += 1
-            idfrominput = items[0]
-            idx = 0
-            row_number = 0
-            for entry in index:
-                id_found, row_number = entry.split("\t")
-                if id_found == idfrominput:
-                    break
-                idx += 1
-            start = int(row_number)
-            # end is the row_number - 1 of the next entry in the index
-            next_entry = index[idx+1].rstrip()
-            dummy, row_number = next_entry.split("\t")
-            end = int(row_number)-1
-            # reformat to one sequence a line
-            tmp_list = []
-            for l in sequences[start:end]:
-                tmp_list.append(l.rstrip())
-            sequence = "".join(tmp_list)
-            if not border:
-                # write to file
-                seq_file.write(">{}\n".format(idfrominput))
-                seq_file.write(sequence + "\n")
-                num += 1
+    if outfilename is None:
+        if border:
+            outfilename = out_filename_seq_border
+        else:
+            outfilename = out_filename_seq
+    # group the repeats by sequence, in the order of the list file
+    repeats_of_seq = {}
+    for i, items in enumerate(accession_repeats):
+        if items[0] in index:
+            if items[0] in repeats_of_seq:
+                repeats_of_seq[items[0]].append((i, items))
             else:
-                # Id   SSR nr.  type SSR   size start end
-                # PK13324.1	1   p2	(TC)15	30	29	 58
-                # 0         1   2   3        4   5    6
-                # --- check for N in border upstream
-                start_repeat = int(items[5])
-                border_up = sequence[(start_repeat - border_len - 1):(start_repeat-1)]
-                # print(items[0], border_up, "\n")
-                if not 'N' in border_up:
-                    # --- check for boder downstream
-                    # 1) size: rest >= border
-                    end_repeat = int(items[6])
-                    rest_after_end = len(sequence) - end_repeat
-                    if rest_after_end >= border_len:
-                        border_down = sequence[end_repeat:(end_repeat + border_len)]
-                        # print(items[0], end_repeat, border_down, "\n")
-                        # 2) downstream border does not contain Ns?
-                        if not 'N' in border_down:
-                            repeats_border_ok.append(items)
-                            seq_file.write(">{}\n".format(idfrominput))
-                            seq_file.write(sequence + "\n")
-                            num += 1
+                repeats_of_seq[items[0]] = [(i, items)]
+    # process accessions in order of the db file, so reads are sequential
+    in_list_order = list(repeats_of_seq)
+    in_db_order = sorted(in_list_order, key=lambda seq_id: index[seq_id][1])
+    units = [(seq_id, repeats_of_seq[seq_id]) for seq_id in in_db_order]
+    with fileio.open_output(outfilename, "wb") as seq_file:
+        repeats_ok, num = run_units(write_sequences, units, (border_len,), dbfile, index, nruns, cachedir, jobs,
+                                    seq_file, in_db_order != in_list_order)
+    repeats_border_ok = None
     if border:
-        # write the list of repeats in separate border file
-        num_repeats_border_ok = len(repeats_border_ok)
-        execution_time = time.time() - start_time
-        if num_repeats_border_ok > 0:
-            with open(out_filename_border, "w") as border_file:
-                border_file.write("Program: {} {}\n".format(os.path.basename(sys.argv[0]), _version_))
-                border_file.write("Date: {} , duration: {:.2f} sec\n".format(time.strftime("%Y-%m-%d %H:%M"), execution_time))
-                border_file.write("Repeats file: {}\n".format(args.listfile))
-                border_file.write("Db file: {}\n".format(args.allseqfile))
-                border_file.write("{} repeats with border ({} bp)\n".format(num_repeats_border_ok, border))
-                border_file.write("=" * 80 + "\n")
-                for items in repeats_border_ok:
-                    border_file.write("{}\n".format("\t".join(items)))
-    return num
-
-
-def load_dbfile(filename):
-    fh = open(filename, "r")
-    seq = fh.readlines()
-    fh.close()
-    return seq
-
-
-def main(listfile, allseqfile, border):
+        # keep the order of the list file for the border file
+        repeats_border_ok = [accession_repeats[i] for i in sorted(repeats_ok)]
+        print_border(repeats_border_ok, border, listfile, dbfile, start_time, outname_border)
+    return num, repeats_border_ok
+
+
+def extract_print_flanks(accession_repeats, listfile, dbfile, index, nruns, border, flank, cachedir, jobs,
+                         start_time, outfilename=out_filename_flanks, outname_border=out_filename_border):
+    """ Write each repeat with flank bp up- and downstream, not the whole sequence
+
+    Only the window of each repeat is read from the db file. The repeats are
+    written in the order of the list file. Returns the same as
+    extract_print_seq().
+    """
+    border_len = None
+    if border:
+        border_len = int(border)
+    # process repeats in order of the db file, so reads are sequential
+    in_list_order = [(i, items) for i, items in enumerate(accession_repeats) if items[0] in index]
+    units = sorted(in_list_order, key=lambda unit: (index[unit[1][0]][1], int(unit[1][5])))
+    with fileio.open_output(outfilename, "wb") as seq_file:
+        repeats_ok, num = run_units(write_flanks, units, (border_len, int(flank)), dbfile, index, nruns, cachedir,
+                                    jobs, seq_file, units != in_list_order)
+    repeats_border_ok = None
+    if border:
+        # keep the order of the list file for the border file
+        repeats_border_ok = [accession_repeats[i] for i in sorted(repeats_ok)]
+        print_border(repeats_border_ok, border, listfile, dbfile, start_time, outname_border)
+    return num, repeats_border_ok
+
+
+def sweep_borders(accession_repeats, index, nruns):
+    """ Find for each repeat the longest border up- and downstream without N
+
+    Returns a list of tuples (items, upstream, downstream) in the order of
+    the list file. A border of n bp is possible if n <= min(upstream, downstream).
+    """
+    sweep = []
+    for items in accession_repeats:
+        if items[0] in index:
+            # Id   SSR nr.  type SSR   size start end
+            # PK13324.1	1   p2	(TC)15	30	29	 58
+            # 0         1   2   3        4   5    6
+            # N runs of the index, the sequence is not read
+            upstream, downstream = nruns.free_flanks(items[0], int(items[5]) - 1, int(items[6]),
+                                                     index[items[0]][0])
+            sweep.append((items, upstream, downstream))
+    return sweep
+
+
+def print_sweep(sweep, listfile, allseqfile, start_time, outfilename=out_filename_sweep, steps=sweep_steps):
+    """ Write the max border of each repeat and the number of repeats passing each border length of steps
+    """
+    import bisect
+    max_borders = sorted(min(upstream, downstream) for items, upstream, downstream in sweep)
+    execution_time = time.time() - start_time
+    with fileio.open_output(outfilename) as sweep_file:
+        sweep_file.write("Program: {} {}\n".format(os.path.basename(sys.argv[0]), _version_))
+        sweep_file.write("Date: {} , duration: {:.2f} sec\n".format(time.strftime("%Y-%m-%d %H:%M"), execution_time))
+        sweep_file.write("Repeats file: {}\n".format(listfile))
+        sweep_file.write("Db file: {}\n".format(allseqfile))
+        sweep_file.write("{} repeats, border without N upstream, downstream and max border (bp)\n".format(len(sweep)))
+        sweep_file.write("=" * 80 + "\n")
+        for items, upstream, downstream in sweep:
+            sweep_file.write("{}\t{}\t{}\t{}\n".format("\t".join(items), upstream, downstream,
+                                                      min(upstream, downstream)))
+        # cumulative: a repeat passes a border length up to its max border
+        sweep_file.write("\n----- Number of repeats with a border without N of at least n bp -----\n")
+        for step in sorted(set(steps)):
+            num_passing = len(max_borders) - bisect.bisect_left(max_borders, step)
+            sweep_file.write("border >= {:>8} bp: {:>8} repeats\n".format(step, num_passing))
+
+
+def main(listfile, allseqfile, border, cachedir, checksum, sweep, flank, jobs, list_items=None, outname=None,
+         outname_border=out_filename_border, outname_info=out_filename_info, steps=sweep_steps):
+        """Main function
+
+        list_items are the items of the repeats of the list file, if
+        already in memory (see pyssrstat.py), else the list file is read.
+        outname is the file of the sequences (of the max borders with sweep),
+        - for standard output, by default the file of the mode. outname_border
+        and outname_info are the border file and the summary.
+        Returns the number of repeats found and the repeats with border
+        (None without border), with sweep the max border of each repeat
+        instead (see sweep_borders()). steps are the border lengths of the
+        table of the sweep.
+        """
         # Start timing
         start_time = time.time()
 
+        if sweep:
+            # one pass for all border lengths, no sequences are written
+            border = None
+        if outname is None:
+            if sweep:
+                outname = out_filename_sweep
+            elif flank:
+                outname = out_filename_flanks
+            elif border:
+                outname = out_filename_seq_border
+            else:
+                outname = out_filename_seq
+
         # Read the list file and extract accession and repeat info
-        accession_repeat_info = readseqidfrominfile(listfile, border)
+        # with border, sweep or flank each repeat is checked, else each sequence extracted once
+        if list_items is None:
+            list_items = readrepeatlines(listfile)
+        accession_repeat_info = select_repeats(list_items, border, bool(border) or sweep or bool(flank))
         numofseqids = len(accession_repeat_info)
 
-        # load db file in memory
-        db_sequences = load_dbfile(allseqfile)
+        # load/create index file for sequences and N runs
+        # PK13324.1  length  offset  linebases  linewidth
+        index, nruns = fastaindex.load_index_nruns(allseqfile, cachedir, checksum)
 
         # search and extract accessions of repeats in db file of sequences
         numfound = 0
-        if numofseqids > 0:
-            numfound = extract_print_seq(accession_repeat_info, db_sequences, border, start_time)
+        found = None
+        if sweep:
+            border_sweep = sweep_borders(accession_repeat_info, index, nruns)
+            print_sweep(border_sweep, listfile, allseqfile, start_time, outname, steps)
+            numfound = len(border_sweep)
+            found = border_sweep
+        elif flank and numofseqids > 0:
+            numfound, found = extract_print_flanks(accession_repeat_info, listfile, allseqfile, index, nruns, border,
+                                                   flank, cachedir, jobs, start_time, outname, outname_border)
+        elif numofseqids > 0:
+            numfound, found = extract_print_seq(accession_repeat_info, listfile, allseqfile, index, nruns, border,
+                                                cachedir, jobs, start_time, outname, outname_border)
 
         # write summary to file
         execution_time = time.time() - start_time
-        with open(out_filename_info, "w") as info_file:
+        with fileio.open_output(outname_info) as info_file:
             info_file.write("Program: {}\n".format(os.path.basename(sys.argv[0]), _version_))
             info_file.write("Date: {}, duration: {:.2f} sec\n".format(time.strftime("%Y-%m-%d %H:%M"), execution_time))
             info_file.write("Input, list of sequences and repeats from: {}\n".format(listfile))
             info_file.write("Input, db file with sequences FASTA: {}\n".format(allseqfile))
-            info_file.write("Num lines of sequence in db file: {}\n".format(len(db_sequences)))
+            info_file.write("Num sequences in db file: {}\n".format(len(index)))
             if border:
                 info_file.write("Mandatory border of bp: {}\n".format(str(border)))
+            if flank:
+                info_file.write("Flank of bp: {}\n".format(str(flank)))
             info_file.write("Found {} repeats\n".format(numfound, execution_time))
-            if border:
-                info_file.write("Output, accessions with border in FASTA format: {}\n".format(out_filename_seq_border))
-                info_file.write("Output, list of accessions with border: {}\n".format(out_filename_border))
+            if sweep:
+                info_file.write("Output, max border of repeats: {}\n".format(outname))
+            elif flank:
+                info_file.write("Output, repeats with flanks in FASTA format: {}\n".format(outname))
+                if border:
+                    info_file.write("Output, list of accessions with border: {}\n".format(outname_border))
+            elif border:
+                info_file.write("Output, accessions with border in FASTA format: {}\n".format(outname))
+                info_file.write("Output, list of accessions with border: {}\n".format(outname_border))
             else:
-                info_file.write("Output, accessions in FASTA format: {}\n".format(out_filename_seq))
+                info_file.write("Output, accessions in FASTA format: {}\n".format(outname))
+        return numfound, found
 
 
 if __name__ == '__main__':
     # Checking command line arguments
     parser = argparse.ArgumentParser()
-    parser.add_argument("listfile", help="list of sequences and repeats")
+    parser.add_argument("listfile", help="list of sequences and repeats, - for standard input")
     parser.add_argument("allseqfile", help="db file in FASTA format with all sequences")
     parser.add_argument("-b", "--border", help="must have n pb border up- and downstream")
+    parser.add_argument("-f", "--flank", help="write only the repeat with n bp up- and downstream")
+    parser.add_argument("-s", "--sweep", help="find max border up- and downstream of each repeat",
+                        action="store_true")
+    parser.add_argument("-ss", "--sweepsteps", help="border lengths of the table of -s, comma separated "
+                        "(default {})".format(",".join(str(step) for step in sweep_steps)))
+    parser.add_argument("-j", "--jobs", help="number of worker processes", type=int, default=1)
+    parser.add_argument("-cd", "--cachedir", help="directory for the index cache (default: next to db file)")
+    parser.add_argument("-cs", "--checksum", help="validate the index cache also by content hash",
+                        action="store_true")
+    parser.add_argument("-o", "--out", help="output file of the sequences (or of the max borders with -s), "
+                        "- for standard output")
+    parser.add_argument("-ob", "--outborder", help="border file, - for standard output (default {})".format(
+        out_filename_border), default=out_filename_border)
+    parser.add_argument("-oi", "--outinfo", help="summary file, - for standard output (default {})".format(
+        out_filename_info), default=out_filename_info)
     args = parser.parse_args()
+    steps = sweep_steps
+    if args.sweepsteps:
+        try:
+            steps = [int(step) for step in args.sweepsteps.split(",")]
+        except ValueError:
+            parser.error("border lengths of -ss must be numbers, e.g. 50,100,200")
+    if fileio.is_stdio(args.allseqfile):
+        parser.error("the db file is read by random access, it can not be read from standard input")
+    if not args.sweep:
+        # before the index is built, the sweep reads only the index
+        try:
+            fastaindex.check_random_access(args.allseqfile)
+        except ValueError as e:
+            parser.error(str(e))
     if args.listfile and args.allseqfile:
-        main(args.listfile, args.allseqfile, args.border)
+        main(args.listfile, args.allseqfile, args.border, args.cachedir, args.checksum, args.sweep,
+             args.flank, args.jobs, outname=args.out, outname_border=args.outborder, outname_info=args.outinfo,
+             steps=steps)
@@ -1 +1 @@
-python %~dp0imperfect.py %1
\ No newline at end of file
+python %~dp0imperfect.py %*
\ No newline at end of file
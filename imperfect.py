@@ -1,11 +1,21 @@
 #!/usr/bin/env python3
 """Stat about imperfect repeats in MISA-file
 
+The compound SSRs are decomposed into their components: motif and number
+of repeats (units) of each SSR and the bases interrupting two of them. The
+adjacent components are counted by pair of motifs, with the number of
+distinct compound SSRs and the mean length of the interruptions.
+
+The MISA-file is read in one pass, each distinct SSR is parsed once. With
+- as MISA-file it is read line by line from standard input, only one SSR
+of each kind of imperfect SSRs is kept.
+
 Usage:
-imperfect.py <MISA-file>
+imperfect.py <MISA-file> [-o <output-file>] [-oc <output-file>]
 
 Output:
-imperfect.txt
+imperfect.txt (or the file of -o, - for standard output)
+imperfect-compound.txt (or the file of -oc)
 
 Author: Mario Nenno
 Version: 2015-08-31
@@ -17,38 +27,101 @@ import os
 import sys
 import time
 import argparse
+from collections import Counter
+
+import fileio
+import misacache
 
 # program version
 _version_ = '1.0'
 
 # output file
 out_filename = "imperfect.txt"
+# output file of the decomposed compound SSRs
+out_filename_compound = "imperfect-compound.txt"
 
 
 def get_imperfect(filename):
     """ Read MISA-file as input
+
+    Returns the first SSR of each kind of imperfect and compound SSRs and
+    the counts of their component pairs, see count_pairs().
     """
+    if fileio.is_stdio(filename):
+        return get_imperfect_lines(filename)
     # ID	     SSR nr.	SSR type	SSR	   size   start  end
     # PK00768.1	 1	        p3	      (GGA)5   15    336    350
 
     # SSR types: p = perfect, c = imperfect, c* = compound
     validssrtypes = ['c', 'c*']
     list_imperfect = []
-    list_ssr = []
-    with open(filename, "r") as infile:
+    # parts of each kind of SSR found, by code of the SSR
+    found_ssr = {}
+    # number of SSRs of each kind
+    num_ssr = Counter()
+    # columns of the MISA file, from its cache if fresh
+    table = misacache.load_misa(filename)
+    valid_codes = table.codes('ssrtypes', validssrtypes)
+    for i, (ssrtype_code, ssr_code) in enumerate(zip(table.ssrtype, table.ssr)):
+        if ssrtype_code in valid_codes:
+            num_ssr[ssr_code] += 1
+            # first SSR of each kind
+            if ssr_code not in found_ssr:
+                found_ssr[ssr_code] = misacache.compound_parts(table.ssrs[ssr_code])
+                #     ['PK14952.1', '1', 'p1', '(T)11', '11', '2418', '2428']
+                #  Idx  0            1    2      3       4
+                list_imperfect.append(table.items(i))
+    return list_imperfect, count_pairs(found_ssr, num_ssr)
+
+
+def get_imperfect_lines(filename):
+    """ Like get_imperfect(), reading the MISA-file line by line, e.g. from standard input
+    """
+    validssrtypes = ['c', 'c*']
+    list_imperfect = []
+    # parts of each kind of SSR found, by SSR
+    found_ssr = {}
+    num_ssr = Counter()
+    with fileio.open_text(filename) as infile:
         for line in infile:
-            line = line.rstrip()
-            items = line.split("\t")
-            #     ['PK14952.1', '1', 'p1', '(T)11', '11', '2418', '2428\n']
-            #  Idx  0            1    2      3       4
-            ssrtype = items[2]
-            ssr = items[3]
-            if ssrtype in validssrtypes:
-                # print(items)
-                if ssr not in list_ssr:
-                    list_ssr.append(ssr)
-                    list_imperfect.append(items)
-    return list_imperfect
+            items = line.rstrip().split("\t")
+            # skip header line, incomplete lines and perfect SSRs
+            if len(items) < 7 or not items[1].isdigit() or items[2] not in validssrtypes:
+                continue
+            num_ssr[items[3]] += 1
+            if items[3] not in found_ssr:
+                found_ssr[items[3]] = misacache.compound_parts(items[3])
+                list_imperfect.append(items[:7])
+    return list_imperfect, count_pairs(found_ssr, num_ssr)
+
+
+def count_pairs(found_ssr, num_ssr):
+    """ Counts of adjacent components of compound SSRs by pair of motifs
+
+    found_ssr holds the parts of each kind of SSR (see
+    misacache.compound_parts()), num_ssr the number of SSRs of each kind.
+    Returns a dictionary (motif, motif) -> [number of pairs, number of
+    distinct SSRs, number of overlapping pairs, bases of the interruptions].
+    """
+    pairs = {}
+    for ssr_code, (components, interruptions) in found_ssr.items():
+        number = num_ssr[ssr_code]
+        # pairs of this kind of SSR, a pair found twice in it counts once as distinct SSR
+        seen = set()
+        for j, interruption in enumerate(interruptions):
+            key = (components[j][0], components[j + 1][0])
+            if key not in pairs:
+                pairs[key] = [0, 0, 0, 0]
+            counts = pairs[key]
+            counts[0] += number
+            if key not in seen:
+                seen.add(key)
+                counts[1] += 1
+            if interruption is None:
+                counts[2] += number
+            else:
+                counts[3] += number * len(interruption)
+    return pairs
 
 
 def analyze(list_items):
@@ -58,7 +131,7 @@ def analyze(list_items):
     count = 0
     num_imperfect = 0
     num_compound = 0
-    listoflength = []
+    listoflength = set()
     #     ['PK14952.1', '1', 'p1', '(T)11', '11', '2418', '2428\n']
     #  Idx  0            1    2      3       4
     for items in list_items:
@@ -71,63 +144,95 @@ def analyze(list_items):
         elif ssrtype == 'c*':
             num_compound += 1
 
-        if l not in listoflength:
-            listoflength.append(l)
-    # Note: is an unordered list
+        listoflength.add(l)
     analysis['num_imperfect'] = num_imperfect
     analysis['num_compound'] = num_compound
     analysis['total'] = count
-    analysis['listoflength'] = listoflength
+    analysis['listoflength'] = sorted(listoflength)
     return analysis
 
 
 def extract(list_imperfect, analysis):
-    # Order listoflength desc
-    extracted = []
-    listoflength = analysis['listoflength']
-    listoflength.sort(reverse=True)
-    for l in listoflength:
-        # print('Length: ', l)
-        for items in list_imperfect:
-            if l == int(items[4]):
-                # print(items)
-                extracted.append(items)
-    # print('Number of length', len(listoflength))
-    return extracted
-
-
-def save(misafile, extracted, analysis, start_time):
+    """ Repeats ordered by length desc, repeats of equal length in order of the MISA-file
+    """
+    # stable sort, reverse keeps the order of equal lengths
+    return sorted(list_imperfect, key=lambda items: int(items[4]), reverse=True)
+
+
+def save(misafile, extracted, analysis, start_time, outname=out_filename):
     """ Save into output file
     """
     execution_time = time.time() - start_time
-    with open(out_filename, 'w') as outfile:
+    with fileio.open_output(outname) as outfile:
         outfile.write("Program: {} {}\n".format(os.path.basename(sys.argv[0]), _version_))
         outfile.write("Date: {}, duration: {:.2f} sec\n".format(time.strftime("%Y-%m-%d %H:%M"), execution_time))
         outfile.write("Input, MISA file: {}\n".format(misafile))
         outfile.write("Imperfect: {}, compound: {}, Total: {}\n".format(
             analysis['num_imperfect'], analysis['num_compound'], analysis['total']))
         outfile.write("Order: longest first, shortest last\n")
-        outfile.write("Output: {}\n".format(out_filename))
+        outfile.write("Output: {}\n".format(outname))
         outfile.write("=" * 70 + "\n")
         for items in extracted:
             seqline = "{}\t{}\t{}\t{}\n".format(items[0], items[2], items[4], items[3])
             outfile.write(seqline)
 
 
-def main(misafile):
+def save_compound(misafile, extracted, pairs, start_time, outname=out_filename_compound):
+    """ Save the component pairs and the decomposed SSRs into output file
+    """
+    execution_time = time.time() - start_time
+    with fileio.open_output(outname) as outfile:
+        outfile.write("Program: {} {}\n".format(os.path.basename(sys.argv[0]), _version_))
+        outfile.write("Date: {}, duration: {:.2f} sec\n".format(time.strftime("%Y-%m-%d %H:%M"), execution_time))
+        outfile.write("Input, MISA file: {}\n".format(misafile))
+        outfile.write("Component pairs: {}\n".format(len(pairs)))
+        outfile.write("Order: pairs by number desc, SSRs longest first\n")
+        outfile.write("Output: {}\n".format(outname))
+        outfile.write("=" * 70 + "\n")
+        outfile.write("Pair\tNumber\tDistinct SSRs\tOverlapping\tMean interruption (bp)\n")
+        for key in sorted(pairs, key=lambda k: (-pairs[k][0], k)):
+            number, distinct, overlapping, bases = pairs[key]
+            interrupted = number - overlapping
+            mean = "{:.2f}".format(bases / interrupted) if interrupted else "-"
+            outfile.write("{}-{}\t{}\t{}\t{}\t{}\n".format(key[0], key[1], number, distinct, overlapping, mean))
+        outfile.write("=" * 70 + "\n")
+        # interruptions as number of bases, * for overlapping SSRs
+        outfile.write("ID\tSSR type\tsize\tSSR\tMotifs\tUnits\tInterruptions (bp)\n")
+        for items in extracted:
+            components, interruptions = misacache.compound_parts(items[3])
+            outfile.write("{}\t{}\t{}\t{}\t{}\t{}\t{}\n".format(
+                items[0], items[2], items[4], items[3],
+                ",".join(motif for motif, units in components),
+                ",".join(str(units) for motif, units in components),
+                ",".join("*" if interruption is None else str(len(interruption))
+                         for interruption in interruptions)))
+
+
+def main(misafile, outname=out_filename, outname_compound=out_filename_compound):
+    """Main function
+
+    Returns the imperfect SSRs as items of a MISA line, longest first, the
+    analysis and the pairs of motifs of the compound SSRs.
+    """
     # Start timing
     start_time = time.time()
 
-    imperfect = get_imperfect(misafile)
+    imperfect, pairs = get_imperfect(misafile)
     analysis = analyze(imperfect)
     extracted = extract(imperfect, analysis)
-    save(misafile, extracted, analysis, start_time)
+    save(misafile, extracted, analysis, start_time, outname)
+    save_compound(misafile, extracted, pairs, start_time, outname_compound)
+    return extracted, analysis, pairs
 
 
 if __name__ == '__main__':
     # command line arguments
     parser = argparse.ArgumentParser()
-    parser.add_argument("misafile", help="file with sequences and repeats")
+    parser.add_argument("misafile", help="file with sequences and repeats, - for standard input")
+    parser.add_argument("-o", "--out", help="output file, - for standard output (default {})".format(out_filename),
+                        default=out_filename)
+    parser.add_argument("-oc", "--outcompound", help="output file of the compound SSRs, - for standard output "
+                        "(default {})".format(out_filename_compound), default=out_filename_compound)
     args = parser.parse_args()
     if args.misafile:
-        main(args.misafile)
+        main(args.misafile, args.out, args.outcompound)
@@ -0,0 +1 @@
+python %~dp0mergestatistics.py %*
\ No newline at end of file
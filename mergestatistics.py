@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""Merge partial statistics of several MISA-files into one repeat analysis
+
+statistics_misa.py with the options -db and -pa writes the counts of the
+SSRs of one MISA-file (e.g. of one chromosome) into repeats_partial.txt.
+This program adds the counts of any number of these files and writes the
+same repeats_analysis.txt as statistics_misa.py for all sequences together.
+
+Usage:
+mergestatistics.py <partial-file> [<partial-file> ...] [-ini misa.ini] [-rpc|--repeatclassses] [-dm]
+                   [-o <output-file>] [-od <prefix>]
+
+Output:
+repeats_analysis.txt (or the file of -o, - for standard output)
+repeats_distribution_*.tsv, repeats_distribution_*.bin (with -dm, prefix of -od, see statistics_misa.py)
+
+Author: Mario Nenno
+Version: 2015-08-31
+Copyright: see file LICENCE.txt
+
+"""
+import time
+import argparse
+
+import misaconfig
+import statistics_misa
+
+
+def main(partialfiles, repeatclasses, inifile=None, distribution=False, outname=statistics_misa.out_filename,
+         outprefix_distribution=statistics_misa.out_prefix_distribution):
+    """Main function
+
+    Returns the lines of the longest motives like statistics_misa.main().
+    """
+    # take start time to calc duration later
+    start_time = time.time()
+
+    list_counts = []
+    definitions = None
+    for filename in partialfiles:
+        counts, partial_definitions = statistics_misa.read_partial(filename)
+        list_counts.append(counts)
+        if partial_definitions is not None:
+            if definitions is not None and definitions != partial_definitions:
+                raise ValueError("Definement of microsatellites in '{}' differs".format(filename))
+            definitions = partial_definitions
+    if inifile is not None:
+        definitions, interruptions = misaconfig.read_ini(inifile)
+
+    counts = statistics_misa.merge_counts(list_counts)
+    if distribution:
+        statistics_misa.write_distributions(counts['motif_repeats'], outprefix_distribution)
+    stats = statistics_misa.statistics_from_counts(counts, definitions)
+    inputs = [("Partial statistics merged", ", ".join(partialfiles)),
+              ("Definement of microsatellites (MISA)", stats['definement_line'])]
+    note = "Note: Numbers label with '(MISA)' are calculated from the MISA files and the db files"
+    return statistics_misa.write_analysis(stats, inputs, note, repeatclasses, start_time, outname)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument("partialfiles", nargs="+", metavar="partialfile",
+                        help="partial statistics written by statistics_misa.py -pa")
+    parser.add_argument("-rpc", "--repeatclasses", help="include SSR repeat classes", action="store_true")
+    parser.add_argument("-ini", "--inifile", help="misa.ini with the definement of microsatellites")
+    parser.add_argument("-dm", "--distribution", help="write the distribution matrices of the SSRs",
+                        action="store_true")
+    parser.add_argument("-o", "--out", help="output file, - for standard output (default {})".format(
+        statistics_misa.out_filename), default=statistics_misa.out_filename)
+    parser.add_argument("-od", "--outdistribution", help="prefix of the files of the distribution matrices "
+                        "(default {})".format(statistics_misa.out_prefix_distribution),
+                        default=statistics_misa.out_prefix_distribution)
+    args = parser.parse_args()
+    try:
+        main(args.partialfiles, args.repeatclasses, args.inifile, args.distribution, args.out, args.outdistribution)
+    except ValueError as e:
+        parser.error(str(e))
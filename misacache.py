@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+"""Columnar binary cache of a MISA-file shared by all programs
+
+The MISA-file is parsed once into typed columns, one value per SSR
+
+    seq      - code of the sequence id
+    nr       - SSR nr.
+    ssrtype  - code of the SSR type (p1 .. p10, c, c*)
+    ssr      - code of the SSR, e.g. (AC)7 or (AT)5ttgc(CA)7
+    motif    - code of the motif of a perfect SSR, e.g. AC ('' for c and c*)
+    repeats  - number of repeats of a perfect SSR (0 for c and c*)
+    size     - length of the SSR in bp
+    start    - start position of the SSR
+    end      - end position of the SSR
+
+The codes refer to tables of unique strings (seqids, ssrtypes, ssrs and
+motifs). The columns are stored in the binary cache file <MISA-file>.misac
+(see filecache.py) next to the MISA-file, or in the cache directory. The
+cache is memory-mapped when loaded and rebuilt automatically when the
+MISA-file changed. The table loaded last is kept in memory, so all programs
+run in one process (see pyssrstat.py) share it; clear_cache() releases it.
+A MISA-file from standard input (file name -) is parsed without cache.
+
+Author: Mario Nenno
+Version: 2015-08-31
+Copyright: see file LICENCE.txt
+
+"""
+import array
+import itertools
+import re
+
+import filecache
+import fileio
+
+# extension of the cache file, appended to the name of the MISA-file
+cache_extension = '.misac'
+
+# kind of cache file of the MISA columns
+cache_kind = b'MISA'
+
+# columns with their array typecode and tag of the section in the cache file
+columns = [('seq', 'I', b'CSEQ'), ('nr', 'I', b'CNR_'), ('ssrtype', 'I', b'CTYP'), ('ssr', 'I', b'CSSR'),
+           ('motif', 'I', b'CMOT'), ('repeats', 'I', b'CREP'), ('size', 'I', b'CSIZ'), ('start', 'I', b'CSTA'),
+           ('end', 'I', b'CEND')]
+
+# tables of unique strings with tag of the section in the cache file
+tables = [('seqids', b'TSEQ'), ('ssrtypes', b'TTYP'), ('ssrs', b'TSSR'), ('motifs', b'TMOT')]
+
+# tables loaded in this process, the table of the last MISA-file is kept (see clear_cache())
+_loaded = filecache.Loaded(max_items=1)
+
+# one SSR of an SSR string, e.g. (AT)5
+_component = re.compile(r'\(([A-Za-z]+)\)(\d+)')
+
+
+class MisaTable(object):
+    """ Columns of the SSRs of a MISA-file
+    """
+
+    def __init__(self, columns_data, tables_data):
+        for name in columns_data:
+            setattr(self, name, columns_data[name])
+        for name in tables_data:
+            setattr(self, name, tables_data[name])
+
+    def __len__(self):
+        return len(self.seq)
+
+    def items(self, i):
+        """ SSR i like a split line of the MISA-file
+        """
+        #     ['PK14952.1', '1', 'p1', '(T)11', '11', '2418', '2428']
+        #  Idx  0            1    2      3       4     5       6
+        return [self.seqids[self.seq[i]], str(self.nr[i]), self.ssrtypes[self.ssrtype[i]], self.ssrs[self.ssr[i]],
+                str(self.size[i]), str(self.start[i]), str(self.end[i])]
+
+    def rows(self):
+        for i in range(len(self.seq)):
+            yield self.items(i)
+
+    def codes(self, table, values):
+        """ Set of the codes of values in a table, values not in the table are ignored
+        """
+        values = set(values)
+        return set(code for code, value in enumerate(getattr(self, table)) if value in values)
+
+
+def split_ssr(ssr):
+    """ Motif and number of repeats of a perfect SSR, e.g. (AC)7 -> ('AC', 7)
+
+    Returns ('', 0) for imperfect and compound SSRs.
+    """
+    end_motif = ssr.find(')')
+    repeats = ssr[end_motif + 1:]
+    if ssr.startswith('(') and repeats.isdigit():
+        return ssr[1:end_motif], int(repeats)
+    return '', 0
+
+
+def ssr_components(ssr):
+    """ Motif and number of repeats of each SSR of an SSR, also of compound SSRs
+
+    e.g. (AT)5ttgc(CA)7 -> [('AT', 5), ('CA', 7)], (A)10(T)12* -> [('A', 10), ('T', 12)]
+    """
+    return [(motif, int(repeats)) for motif, repeats in _component.findall(ssr)]
+
+
+def compound_parts(ssr):
+    """ Components of an SSR and the bases between each two of them
+
+    Returns the list of (motif, number of repeats) like ssr_components() and
+    the list of the interruptions between the components, None where two
+    SSRs overlap (marked with * by MISA), e.g.
+    (AT)5ttgc(CA)7 -> [('AT', 5), ('CA', 7)], ['ttgc']
+    (A)10(T)12*    -> [('A', 10), ('T', 12)], [None]
+    """
+    components = []
+    interruptions = []
+    end = 0
+    for m in _component.finditer(ssr):
+        if components:
+            # MISA marks an SSR overlapping the previous one with * after it
+            overlap = ssr.startswith('*', m.end())
+            interruptions.append(None if overlap else ssr[end:m.start()].lstrip('*'))
+        components.append((m.group(1), int(m.group(2))))
+        end = m.end()
+    return components, interruptions
+
+
+def parse_misa(filename):
+    """ Parse the MISA-file into columns and tables
+    """
+    with fileio.open_text(filename) as infile:
+        return parse_lines(infile)
+
+
+def parse_lines(lines):
+    """ Parse lines of a MISA-file into columns and tables
+    """
+    columns_data = dict((name, array.array(typecode)) for name, typecode, tag in columns)
+    tables_data = dict((name, []) for name, tag in tables)
+    table_codes = dict((name, {}) for name, tag in tables)
+
+    def code(table, value):
+        codes = table_codes[table]
+        if value not in codes:
+            codes[value] = len(codes)
+            tables_data[table].append(value)
+        return codes[value]
+
+    col_seq = columns_data['seq']
+    col_nr = columns_data['nr']
+    col_ssrtype = columns_data['ssrtype']
+    col_ssr = columns_data['ssr']
+    col_motif = columns_data['motif']
+    col_repeats = columns_data['repeats']
+    col_size = columns_data['size']
+    col_start = columns_data['start']
+    col_end = columns_data['end']
+    # motif and repeats are parsed once for each unique SSR
+    ssr_parts = []
+    for line in lines:
+        items = line.rstrip().split("\t")
+        #     ['PK14952.1', '1', 'p1', '(T)11', '11', '2418', '2428\n']
+        #  Idx  0            1    2      3       4     5       6
+        # skip header line and incomplete lines
+        if len(items) < 7 or not items[1].isdigit():
+            continue
+        col_seq.append(code('seqids', items[0]))
+        col_nr.append(int(items[1]))
+        col_ssrtype.append(code('ssrtypes', items[2]))
+        ssr_code = code('ssrs', items[3])
+        if ssr_code == len(ssr_parts):
+            motif, repeats = split_ssr(items[3])
+            ssr_parts.append((code('motifs', motif), repeats))
+        motif_code, repeats = ssr_parts[ssr_code]
+        col_ssr.append(ssr_code)
+        col_motif.append(motif_code)
+        col_repeats.append(repeats)
+        col_size.append(int(items[4]))
+        col_start.append(int(items[5]))
+        col_end.append(int(items[6]))
+    return columns_data, tables_data
+
+
+def read_blocks(filename, block_lines):
+    """ Tables of the blocks of block_lines lines of a MISA-file, one after the other
+
+    Only one block is in memory, e.g. of a MISA-file from standard input.
+    The codes of each table refer to the tables of strings of its block.
+    """
+    with fileio.open_text(filename) as infile:
+        while True:
+            block = list(itertools.islice(infile, block_lines))
+            if not block:
+                break
+            yield MisaTable(*parse_lines(block))
+
+
+def pack_table(columns_data, tables_data):
+    """ Columns and tables as sections of a binary cache file
+    """
+    sections = {}
+    for name, typecode, tag in columns:
+        sections[tag] = filecache.pack_array(typecode, columns_data[name])
+    for name, tag in tables:
+        # each string ends with a line break, an empty string is a valid entry
+        sections[tag] = ''.join(value + '\n' for value in tables_data[name]).encode()
+    return sections
+
+
+def unpack_table(sections):
+    columns_data = {}
+    for name, typecode, tag in columns:
+        columns_data[name] = filecache.view_array(typecode, sections[tag])
+    tables_data = {}
+    for name, tag in tables:
+        tables_data[name] = bytes(sections[tag]).decode().split('\n')[:-1]
+    return columns_data, tables_data
+
+
+def load_misa(filename, cachedir=None):
+    """ Load the columns of a MISA-file from its cache, (re)build the cache if missing or stale
+    """
+    if fileio.is_stdio(filename):
+        return MisaTable(*parse_misa(filename))
+    cachefile = filecache.cache_filename(filename, cache_extension, cachedir)
+    stamp = filecache.source_stamp(filename)
+    table = _loaded.get(cachefile, stamp)
+    if table is not None:
+        return table
+    sections = filecache.read_cache(cachefile, cache_kind, stamp, use_mmap=True)
+    if sections is not None:
+        table = MisaTable(*unpack_table(sections))
+    else:
+        columns_data, tables_data = parse_misa(filename)
+        filecache.write_cache(cachefile, cache_kind, stamp, pack_table(columns_data, tables_data))
+        table = MisaTable(columns_data, tables_data)
+    _loaded.put(cachefile, stamp, table)
+    return table
+
+
+def clear_cache():
+    """ Release the table kept in memory, e.g. in a long-lived process
+    """
+    _loaded.clear()
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""Read the MISA configuration file misa.ini
+
+    definition(unit_size,min_repeats):                   1-10 2-6 3-5 4-5 5-5 6-5 7-3 8-2 9-2 10-2
+    interruptions(max_difference_between_2_SSRs):        100
+
+The file is parsed like misa.pl does: the numbers after a key starting
+with 'def' are pairs of unit size and minimum number of repeats, the number
+after a key starting with 'int' is the maximal distance of two SSRs of a
+compound SSR.
+
+Author: Mario Nenno
+Version: 2015-08-31
+Copyright: see file LICENCE.txt
+
+"""
+import os
+import re
+
+# name of the configuration file of MISA
+ini_filename = 'misa.ini'
+
+_definition = re.compile(r'^def\S*\s+(.*)', re.IGNORECASE)
+_interruptions = re.compile(r'^int\S*\s+(\d+)', re.IGNORECASE)
+
+
+def read_ini(filename):
+    """ Definitions and interruptions of a misa.ini file
+
+    Returns a list of (unit size, minimum number of repeats) ordered by unit
+    size and the maximal number of bases interrupting 2 SSRs.
+    """
+    definitions = {}
+    interruptions = 0
+    with open(filename) as infile:
+        for line in infile:
+            m = _definition.match(line)
+            if m:
+                numbers = [int(n) for n in re.findall(r'\d+', m.group(1))]
+                definitions = dict(zip(numbers[0::2], numbers[1::2]))
+            m = _interruptions.match(line)
+            if m:
+                interruptions = int(m.group(1))
+    return sorted(definitions.items()), interruptions
+
+
+def find_ini(*filenames):
+    """ Path of misa.ini in the directory of one of the files or in the working directory, None if not found
+    """
+    directories = [os.path.dirname(os.path.abspath(filename)) for filename in filenames] + [os.getcwd()]
+    for directory in directories:
+        path = os.path.join(directory, ini_filename)
+        if os.path.isfile(path):
+            return path
+    return None
+
+
+def definement_line(definitions):
+    """ Definitions like MISA writes them to the MISA-statistics-file, e.g. (1/10) (2/6)
+    """
+    return " ".join("({}/{})".format(unit_size, min_repeats) for unit_size, min_repeats in definitions)
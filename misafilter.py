@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""Select SSRs of a MISA-file by combined criteria
+
+Each criterion is evaluated over a whole column of the MISA table (see
+misacache.py) at once and gives a mask, one byte per SSR (1 = selected).
+The masks of all criteria are combined with a bitwise and; only the SSRs
+of the combined mask are read from the table.
+
+Criteria of select():
+
+    ssrtypes      - SSR types, e.g. ['p2', 'p3', 'c']
+    motifs        - motifs of perfect SSRs, e.g. ['AC', 'AG']
+    motif_classes - classes of motifs, e.g. ['AC/GT'] (see motifclass.py)
+    size          - (min, max) length of the SSR in bp
+    position      - (from, to) region of the sequence containing the SSR
+    end_distance  - minimum number of bases before and after the SSR,
+                    needs the lengths of the sequences (seq_lengths)
+    allow         - sequence ids to keep
+    deny          - sequence ids to skip
+
+Author: Mario Nenno
+Version: 2015-08-31
+Copyright: see file LICENCE.txt
+
+"""
+import itertools
+
+import fileio
+import motifclass
+
+# largest value of a column for a range check by lookup table
+_max_lookup = 1 << 20
+
+
+def code_mask(column, codes, num_codes, selected=1):
+    """ Mask of the rows with a code in codes
+
+    num_codes is the size of the table of codes. With selected=0 the mask
+    of the rows with a code not in codes is returned.
+    """
+    lookup = bytearray([1 - selected]) * num_codes
+    for code in codes:
+        lookup[code] = selected
+    return bytes(map(lookup.__getitem__, column))
+
+
+def range_mask(column, lo, hi):
+    """ Mask of the rows with lo <= value <= hi, a limit of None is open
+    """
+    if len(column) == 0:
+        return b''
+    top = max(column)
+    if lo is None:
+        lo = 0
+    if hi is None:
+        hi = top
+    if top <= _max_lookup:
+        lookup = bytearray(top + 1)
+        first = max(lo, 0)
+        last = min(hi, top)
+        if first <= last:
+            lookup[first:last + 1] = b'\x01' * (last - first + 1)
+        return bytes(map(lookup.__getitem__, column))
+    return bytes(lo <= value <= hi for value in column)
+
+
+def end_distance_mask(table, seq_lengths, distance):
+    """ Mask of the SSRs with at least distance bases before and after them
+
+    seq_lengths is a dictionary sequence id -> length of the sequence.
+    """
+    lengths = []
+    for seq_id in table.seqids:
+        if seq_id not in seq_lengths:
+            raise ValueError("Sequence '{}' not in db file".format(seq_id))
+        lengths.append(seq_lengths[seq_id])
+    # start is 1-based, like the border of getsequences.py
+    return bytes(start > distance and end + distance <= lengths[seq]
+                 for seq, start, end in zip(table.seq, table.start, table.end))
+
+
+def and_masks(masks, num_rows):
+    """ Bitwise and of masks of num_rows rows
+    """
+    result = None
+    for mask in masks:
+        value = int.from_bytes(mask, 'little')
+        result = value if result is None else result & value
+    if result is None:
+        return b'\x01' * num_rows
+    return result.to_bytes(num_rows, 'little')
+
+
+def _key(value):
+    """ Hashable key of the value of a criterion
+    """
+    if isinstance(value, (set, frozenset)):
+        return frozenset(value)
+    if isinstance(value, (list, tuple)):
+        return tuple(value)
+    return value
+
+
+def select(table, ssrtypes=None, motifs=None, motif_classes=None, size=None, position=None,
+           end_distance=None, seq_lengths=None, allow=None, deny=None, masks_cache=None):
+    """ Mask of the SSRs of the table matching all given criteria
+
+    masks_cache is a dictionary to share the masks of equal criteria
+    between several calls for the same table, see select_many().
+    """
+    if masks_cache is None:
+        masks_cache = {}
+
+    def mask(name, value, make_mask):
+        key = (name, _key(value))
+        if key not in masks_cache:
+            masks_cache[key] = make_mask()
+        masks.append(masks_cache[key])
+
+    masks = []
+    if ssrtypes is not None:
+        mask('ssrtypes', ssrtypes, lambda: code_mask(table.ssrtype, table.codes('ssrtypes', ssrtypes),
+                                                     len(table.ssrtypes)))
+    if motifs is not None:
+        mask('motifs', motifs, lambda: code_mask(table.motif, table.codes('motifs', motifs), len(table.motifs)))
+    if motif_classes is not None:
+        mask('motif_classes', motif_classes, lambda: motif_class_mask(table, motif_classes))
+    if size is not None:
+        mask('size', size, lambda: range_mask(table.size, size[0], size[1]))
+    if position is not None:
+        mask('from', position[0], lambda: range_mask(table.start, position[0], None))
+        mask('to', position[1], lambda: range_mask(table.end, None, position[1]))
+    if end_distance is not None:
+        mask('end_distance', end_distance, lambda: end_distance_mask(table, seq_lengths, end_distance))
+    if allow is not None:
+        mask('allow', allow, lambda: code_mask(table.seq, table.codes('seqids', allow), len(table.seqids)))
+    if deny is not None:
+        mask('deny', deny, lambda: code_mask(table.seq, table.codes('seqids', deny), len(table.seqids),
+                                             selected=0))
+    return and_masks(masks, len(table))
+
+
+def select_many(table, filters):
+    """ Masks of the SSRs of the table for a list of filters (each a dictionary of criteria)
+
+    A criterion shared by several filters is evaluated only once.
+    """
+    masks_cache = {}
+    return [select(table, masks_cache=masks_cache, **criteria) for criteria in filters]
+
+
+def motif_class_mask(table, motif_classes):
+    """ Mask of the SSRs with a motif of the classes
+    """
+    # a class may be given by any motif of it, e.g. 'CA' or 'GT/AC' for 'AC/GT'
+    classes = set(motifclass.motif_class(c.split('/')[0]) for c in motif_classes)
+    codes = [code for code, motif in enumerate(table.motifs)
+             if motif and motifclass.motif_class(motif) in classes]
+    return code_mask(table.motif, codes, len(table.motifs))
+
+
+def selected_rows(mask):
+    """ Numbers of the selected rows of a mask
+    """
+    return itertools.compress(range(len(mask)), mask)
+
+
+def read_ids(filename):
+    """ Sequence ids from a file, one id per line
+    """
+    with fileio.open_text(filename) as infile:
+        return set(line.strip() for line in infile if line.strip())
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""Classes of SSR motifs considering rotation and the complementary strand
+
+A motif, all its rotations and the rotations of its reverse complement
+belong to one class, named like MISA names it in the MISA-statistics-file:
+
+    AC, CA, GT, TG      -> AC/GT
+    AAT, ATA, TAA, ATT  -> AAT/ATT
+    AT, TA              -> AT/AT
+
+Motifs of A, C, G and T up to unit size 10 are classified with a table of
+all motifs of a unit size (4^10 motifs for unit size 10), each motif coded
+as a number in base 4. The table of a unit size is built when it is first
+needed and stored in the binary cache file motifclass.py.<hash>.<size>.mcls
+(see filecache.py) in the given cache directory, by default in the cache
+directory of the user (~/.cache/pyssrstat, %LOCALAPPDATA%\\PySSRstat on
+Windows, or PYSSRSTAT_CACHE), so the programs may be installed read-only.
+
+Author: Mario Nenno
+Version: 2015-08-31
+Copyright: see file LICENCE.txt
+
+"""
+import array
+
+import filecache
+
+# largest unit size classified by table
+max_table_unit_size = 10
+
+# kind of cache file of a table of motif classes
+cache_kind = b'MCLS'
+
+# complementary bases, other characters are kept like MISA does
+_complement = str.maketrans('ACGT', 'TGCA')
+# digits of the bases of a motif coded in base 4
+_digits = str.maketrans('ACGT', '0123')
+_bases = 'ACGT'
+
+# tables of motif classes by unit size: (class of each motif code, names of the classes)
+_tables = {}
+
+
+def reverse_complement(motif):
+    return motif.translate(_complement)[::-1]
+
+
+def min_rotation(motif):
+    """ Alphabetically first rotation of a motif
+    """
+    return min(motif[i:] + motif[:i] for i in range(len(motif))) if motif else motif
+
+
+def motif_class(motif, cachedir=None):
+    """ Class of a motif like in the MISA-statistics-file, e.g. CA -> AC/GT
+
+    cachedir is the directory of the cached tables, see class_table().
+    """
+    motif = motif.upper()
+    unit_size = len(motif)
+    if 0 < unit_size <= max_table_unit_size and not motif.strip(_bases):
+        classes, names = class_table(unit_size, cachedir)
+        return names[classes[int(motif.translate(_digits), 4)]]
+    return calc_motif_class(motif)
+
+
+def calc_motif_class(motif):
+    """ Class of a motif calculated from its rotations, see motif_class()
+    """
+    motif = motif.upper()
+    actual = min_rotation(motif)
+    reverse = min_rotation(reverse_complement(motif))
+    if actual < reverse:
+        return "{}/{}".format(actual, reverse)
+    return "{}/{}".format(reverse, actual)
+
+
+def decode(code, unit_size):
+    """ Motif of a code in base 4
+    """
+    bases = []
+    for i in range(unit_size):
+        bases.append(_bases[code & 3])
+        code >>= 2
+    return ''.join(reversed(bases))
+
+
+def build_class_table(unit_size):
+    """ Class of each motif of a unit size, returns the array of the class
+    numbers indexed by the motif code and the list of the names of the classes
+    """
+    num_motifs = 4 ** unit_size
+    high = 4 ** (unit_size - 1)
+    unassigned = 0xFFFFFFFF
+    classes = array.array('I', [unassigned]) * num_motifs
+    names = []
+    for code in range(num_motifs):
+        if classes[code] != unassigned:
+            continue
+        class_nr = len(names)
+        motif = decode(code, unit_size)
+        names.append(calc_motif_class(motif))
+        # all rotations of the motif and of its reverse complement
+        reverse = int(reverse_complement(motif).translate(_digits), 4)
+        for start in (code, reverse):
+            rotated = start
+            for i in range(unit_size):
+                classes[rotated] = class_nr
+                # rotate by one base to the left
+                rotated = (rotated % high) * 4 + rotated // high
+    return classes, names
+
+
+def class_table(unit_size, cachedir=None):
+    """ Table of the motif classes of a unit size, from its cache or built and cached
+
+    The cache is stored in cachedir, by default in the cache directory of
+    the user (see filecache.user_cache_dir()).
+    """
+    if unit_size in _tables:
+        return _tables[unit_size]
+    if cachedir is None:
+        cachedir = filecache.user_cache_dir()
+    cachefile = filecache.cache_filename(__file__, '.{}.mcls'.format(unit_size), cachedir)
+    stamp = filecache.source_stamp(__file__)
+    sections = filecache.read_cache(cachefile, cache_kind, stamp, use_mmap=True)
+    if sections is not None:
+        table = (filecache.view_array('I', sections[b'CLAS']), bytes(sections[b'NAME']).decode().split('\n'))
+    else:
+        table = build_class_table(unit_size)
+        filecache.write_cache(cachefile, cache_kind, stamp, {
+            b'CLAS': filecache.pack_array('I', table[0]),
+            b'NAME': '\n'.join(table[1]).encode(),
+        })
+    _tables[unit_size] = table
+    return table
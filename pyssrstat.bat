@@ -0,0 +1 @@
+python %~dp0pyssrstat.py %*
\ No newline at end of file
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""Run the programs of PySSRstat in one process
+
+'run' runs the programs of Example/run.bat one after the other:
+statistics_misa, statgetlongest, filterrepeatsmisa and getsequences. The
+MISA-file and the index of the db file are loaded once and shared by all
+programs, the results are passed on in memory. The output files are the
+same as of the single programs.
+
+The config file has a section [run]:
+
+    [run]
+    fastafile = sequences.fasta
+    repeatclasses = yes
+    min = 30
+    max = 200
+    sortmode = repeat
+    border = 200
+
+fastafile      - db file (FASTA), needed
+misafile       - MISA-file, default <fastafile>.misa
+statisticsfile - MISA-statistics-file, default <fastafile>.statistics; if
+                 it does not exist the statistics are calculated from the
+                 MISA-file and the db file
+search         - yes: search the SSRs with ssrsearch.py first, instead of misa.pl
+inifile        - misa.ini, default next to the MISA-file or the working directory
+jobs           - number of worker processes of ssrsearch and getsequences
+repeatclasses  - yes: include SSR repeat classes (statistics_misa -rpc)
+min, max       - range of repeat length (filterrepeatsmisa), default 30 and 200
+sortmode       - repeat or motif, default repeat
+imperfect      - yes: include imperfect SSRs (filterrepeatsmisa -i)
+ranges         - further ranges of repeat length, e.g. 20-30,30-60
+border         - border in bp (getsequences -b)
+
+Usage:
+pyssrstat.py run <config-file>
+
+Output:
+repeats_analysis.txt, longest-sequences-list.txt,
+filtered-repeats-sequence-list.txt, getsequences-info.txt and the files of
+getsequences, see the single programs
+
+Author: Mario Nenno
+Version: 2015-08-31
+Copyright: see file LICENCE.txt
+
+"""
+import argparse
+import configparser
+import os
+
+import filterrepeatsmisa
+import getsequences
+import misacache
+import ssrsearch
+import statgetlongest
+import statistics_misa
+
+# program version
+_version_ = '1.0'
+
+# section of the config file
+config_section = 'run'
+
+
+def read_config(filename):
+    """ Settings of the config file as dictionary, with the defaults of missing keys
+    """
+    parser = configparser.ConfigParser()
+    with open(filename) as infile:
+        parser.read_file(infile)
+    if config_section not in parser:
+        raise ValueError("Section [{}] missing in '{}'".format(config_section, filename))
+    section = parser[config_section]
+    if not section.get('fastafile'):
+        raise ValueError("fastafile missing in '{}'".format(filename))
+    fastafile = section['fastafile']
+    try:
+        config = {
+            'fastafile': fastafile,
+            'misafile': section.get('misafile') or ssrsearch.out_filename.format(fastafile),
+            'statisticsfile': section.get('statisticsfile') or ssrsearch.out_filename_statistics.format(fastafile),
+            'search': section.getboolean('search', False),
+            'inifile': section.get('inifile') or None,
+            'jobs': section.getint('jobs', 1),
+            'repeatclasses': section.getboolean('repeatclasses', False),
+            'min': section.getint('min', 30),
+            'max': section.getint('max', 200),
+            'sortmode': section.get('sortmode', 'repeat'),
+            'imperfect': section.getboolean('imperfect', False),
+            'ranges': [filterrepeatsmisa.parse_range(text) for text in section.get('ranges', '').split(",") if text],
+            'border': section.get('border') or None,
+        }
+    except ValueError as e:
+        raise ValueError("{} in '{}'".format(e, filename))
+    if config['sortmode'] not in ('motif', 'repeat'):
+        raise ValueError("sortmode must be motif or repeat in '{}'".format(filename))
+    return config
+
+
+def run(config):
+    """ Run all programs with the settings of the config
+    """
+    fastafile = config['fastafile']
+    misafile = config['misafile']
+    statisticsfile = config['statisticsfile']
+    if config['search']:
+        ssrsearch.main(fastafile, config['inifile'], jobs=config['jobs'], outname=misafile,
+                       outname_statistics=statisticsfile)
+
+    # load the MISA-file once, all programs get the same table
+    misacache.load_misa(misafile)
+
+    # statistics_misa, from the MISA-statistics-file if there is one
+    if os.path.isfile(statisticsfile):
+        longest_lines = statistics_misa.main(statisticsfile, misafile, config['repeatclasses'])
+    else:
+        longest_lines = statistics_misa.main(None, misafile, config['repeatclasses'], fastafile, config['inifile'])
+
+    # statgetlongest with the longest motives of the analysis
+    statgetlongest.main(statistics_misa.out_filename, misafile, longest_lines)
+
+    # filterrepeatsmisa
+    table, masks = filterrepeatsmisa.main(misafile, config['min'], config['max'], config['sortmode'],
+                                          ranges=config['ranges'], imperfect=config['imperfect'])
+
+    # getsequences with the repeats of the filter, in the order of its output file
+    list_items = [table.items(i) for i in filterrepeatsmisa.sortedrows(table, masks[0], config['sortmode'])]
+    getsequences.main(filterrepeatsmisa.out_filename, fastafile, config['border'], None, False, False, None,
+                      config['jobs'], list_items)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    subparsers = parser.add_subparsers(dest="command", metavar="command")
+    parser_run = subparsers.add_parser("run", help="run all programs with the settings of a config file")
+    parser_run.add_argument("configfile", help="config file with the section [run]")
+    args = parser.parse_args()
+    if args.command is None:
+        parser.error("a command is needed, e.g. run")
+    try:
+        run(read_config(args.configfile))
+    except ValueError as e:
+        parser.error(str(e))
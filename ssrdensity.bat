@@ -0,0 +1 @@
+python %~dp0ssrdensity.py %*
\ No newline at end of file
@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""Density of SSRs in sliding windows along each sequence as bedGraph
+
+For each window size the sequences are divided into windows of that size,
+moved by the step (by default the window size, i.e. adjacent windows). The
+value of a window is the density of SSRs in bp/Mb (bases of SSRs in the
+window per Mb of the window) or, with -v abundance, the abundance in SSR/Mb
+(SSRs starting in the window per Mb of the window), like the genome-wide
+figures of statistics_misa.py. The last window of a sequence may be shorter.
+
+The positions of the SSRs are taken from the MISA-file, the lengths of the
+sequences from the index of the db file (see fastaindex.py). The SSRs of a
+sequence are sorted by start once; the value of each window is then taken
+from the cumulated SSR lengths by bisection, so the tracks of all window
+sizes are written in one pass over the sequences.
+
+Usage:
+ssrdensity.py <MISA-file> -db <db-file> [-w <window> [<window> ...]] [-s <step>] [-v density|abundance]
+
+Output:
+ssr-<value>-<window>.bedgraph, e.g. ssr-density-100000.bedgraph
+ssr-<value>-<window>-<step>.bedgraph if the step differs from the window
+
+Author: Mario Nenno
+Version: 2015-08-31
+Copyright: see file LICENCE.txt
+
+"""
+import argparse
+import array
+import bisect
+
+import fastaindex
+import misacache
+
+# program version
+_version_ = '1.0'
+
+# output file by value, window size and step
+out_filename = 'ssr-{}-{}.bedgraph'
+out_filename_step = 'ssr-{}-{}-{}.bedgraph'
+
+# default window size in bp
+default_window = 100000
+
+# description of the values in the track line
+value_names = {'density': 'SSR density (bp/Mb)', 'abundance': 'SSR abundance (SSR/Mb)'}
+
+
+def sequence_positions(table):
+    """ Starts (0-based) and ends (excluded) of the SSRs of each sequence, sorted by start
+
+    Returns a dictionary sequence id -> (starts, ends), each an array.
+    """
+    order = sorted(range(len(table)), key=lambda i: (table.seq[i], table.start[i]))
+    positions = {}
+    for i in order:
+        seq_id = table.seqids[table.seq[i]]
+        if seq_id not in positions:
+            positions[seq_id] = (array.array('Q'), array.array('Q'))
+        starts, ends = positions[seq_id]
+        starts.append(table.start[i] - 1)
+        ends.append(table.end[i])
+    return positions
+
+
+def cumulated_lengths(starts, ends):
+    """ Bases of SSRs before each SSR, one more value for all SSRs
+    """
+    cumulated = array.array('Q', [0])
+    total = 0
+    for start, end in zip(starts, ends):
+        total += end - start
+        cumulated.append(total)
+    return cumulated
+
+
+def covered(starts, ends, cumulated, pos):
+    """ Bases of SSRs before pos (0-based), SSRs do not overlap
+    """
+    i = bisect.bisect_left(starts, pos)
+    bases = cumulated[i]
+    # the SSR before pos may reach beyond it
+    if i > 0 and ends[i - 1] > pos:
+        bases -= ends[i - 1] - pos
+    return bases
+
+
+def windows(length, window, step):
+    """ Start and end (excluded) of the windows of a sequence
+    """
+    start = 0
+    while start < length:
+        yield start, min(start + window, length)
+        if start + window >= length:
+            break
+        start += step
+
+
+def window_values(starts, ends, cumulated, length, window, step, value):
+    """ Start, end and value (per Mb) of each window of a sequence
+    """
+    for start, end in windows(length, window, step):
+        if value == 'abundance':
+            number = bisect.bisect_left(starts, end) - bisect.bisect_left(starts, start)
+        else:
+            number = covered(starts, ends, cumulated, end) - covered(starts, ends, cumulated, start)
+        yield start, end, number * 1000000 / (end - start)
+
+
+def track_filename(value, window, step):
+    if step == window:
+        return out_filename.format(value, window)
+    return out_filename_step.format(value, window, step)
+
+
+def main(misafile, dbfile, window_sizes, step=None, value='density'):
+    """Main function
+
+    Writes one bedGraph file for each window size, step None means windows
+    next to each other. Returns the names of the files.
+    """
+    table = misacache.load_misa(misafile)
+    index = fastaindex.load_index(dbfile)
+    positions = sequence_positions(table)
+    for seq_id in positions:
+        if seq_id not in index:
+            raise ValueError("Sequence '{}' not in db file".format(seq_id))
+
+    tracks = []
+    for window in window_sizes:
+        window_step = window if step is None else step
+        outfile = open(track_filename(value, window, window_step), 'w')
+        outfile.write('track type=bedGraph name="SSR {} {}" description="{}, window {} bp, step {} bp"\n'.format(
+            value, window, value_names[value], window, window_step))
+        tracks.append((window, window_step, outfile))
+
+    empty = (array.array('Q'), array.array('Q'))
+    try:
+        # sequences in the order of the db file
+        for seq_id, record in index.items():
+            starts, ends = positions.get(seq_id, empty)
+            cumulated = cumulated_lengths(starts, ends)
+            for window, window_step, outfile in tracks:
+                for start, end, number in window_values(starts, ends, cumulated, record[0], window, window_step,
+                                                        value):
+                    outfile.write("{}\t{}\t{}\t{:.2f}\n".format(seq_id, start, end, number))
+    finally:
+        for window, window_step, outfile in tracks:
+            outfile.close()
+    return [outfile.name for window, window_step, outfile in tracks]
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument("misafile", help="file with sequences and repeats (MISA-file)")
+    parser.add_argument("-db", "--dbfile", help="db file (FASTA) of the MISA-file", required=True)
+    parser.add_argument("-w", "--window", help="window sizes in bp (default {})".format(default_window),
+                        nargs="+", type=int, default=[default_window])
+    parser.add_argument("-s", "--step", help="step of the windows in bp (default the window size)", type=int)
+    parser.add_argument("-v", "--value", help="value of the windows (default density)",
+                        choices=sorted(value_names), default='density')
+    args = parser.parse_args()
+    if min(args.window) < 1:
+        parser.error("window size must be at least 1")
+    if args.step is not None and not 0 < args.step <= min(args.window):
+        parser.error("step must be at least 1 and not larger than the window size")
+    try:
+        main(args.misafile, args.dbfile, args.window, args.step, args.value)
+    except ValueError as e:
+        parser.error(str(e))
@@ -0,0 +1 @@
+python %~dp0ssrsearch.py %*
\ No newline at end of file
@@ -0,0 +1,505 @@
+#!/usr/bin/env python3
+"""Search SSRs in a FASTA file like MISA, without Perl
+
+Reads the definitions of microsatellites from misa.ini (see misaconfig.py)
+and writes the MISA-file and the MISA-statistics-file byte by byte like
+misa.pl does, so all PySSRstat programs use them unchanged.
+
+Each unit size is searched with one compiled regular expression over the
+whole sequence, the same expression misa.pl uses. Motifs made of a shorter
+motif, e.g. (TT)6 or (ACAC)5, are rejected like by MISA. SSRs with at most
+the interruption of misa.ini between them are joined into compound SSRs
+(type c, or c* if they overlap).
+
+With -j the sequences are split into chunks scanned by several processes.
+Each chunk is scanned a little beyond its end, by the length of the
+longest SSR of the minimum number of repeats, to find every SSR starting
+in it. Joining the chunks the search goes on where the search of the
+previous chunk ended, like in one scan of the whole sequence; SSRs
+reaching beyond the scanned part are followed in the whole sequence.
+Compound SSRs are joined after, on all SSRs of a sequence, so the output
+is the same as without -j.
+
+With -cmp the output is not written but compared with the existing
+MISA-file and MISA-statistics-file of the FASTA file, e.g. to check the
+program against the output of misa.pl in the directory Example.
+
+With - as FASTA file the sequences are read from standard input, with
+-o - the MISA-file is written to standard output, e.g. to pipe it into
+filterrepeatsmisa.py.
+
+Usage:
+ssrsearch.py <FASTA-file> [-ini misa.ini] [-j <n>] [-ch <chunk-size>] [-cmp] [-o <MISA-file>]
+             [-os <MISA-statistics-file>]
+
+Output:
+<FASTA-file>.misa (or the file of -o)
+<FASTA-file>.statistics (or the file of -os)
+
+Author: Mario Nenno
+Version: 2015-08-31
+Copyright: see file LICENCE.txt
+
+"""
+import argparse
+import array
+import os
+import re
+import shutil
+import sys
+from collections import Counter
+
+import fileio
+import misaconfig
+import motifclass
+
+# program version
+_version_ = '1.0'
+
+# output files, appended to the name of the FASTA file like misa.pl does
+out_filename = '{}.misa'
+out_filename_statistics = '{}.statistics'
+
+# header line of the MISA-file
+misa_header = "ID\tSSR nr.\tSSR type\tSSR\tsize\tstart\tend\n"
+
+# bytes read from the FASTA file at once
+_block_size = 1 << 20
+
+# default number of bases of a chunk of a sequence scanned by one process
+default_chunk_size = 1000000
+
+# characters removed from the sequence and whitespace of the id, like misa.pl
+_not_sequence = re.compile(rb'[\d\s>]')
+_whitespace = re.compile(rb'\s')
+
+
+def read_records(filename):
+    """ Id and sequence of each record of a FASTA file, like misa.pl reads them
+
+    Records are separated by '>', the id is the first line of the record
+    with whitespace trimmed and replaced by '_', the sequence is the rest of
+    the record without digits and whitespace. Records without line break
+    are skipped.
+    """
+    rest = b''
+    with fileio.open_binary(filename) as infile:
+        while True:
+            block = infile.read(_block_size)
+            records = (rest + block).split(b'>')
+            rest = records.pop() if block else b''
+            for record in records:
+                newline = record.find(b'\n')
+                if newline < 0:
+                    continue
+                seq_id = _whitespace.sub(b'_', record[:newline].strip(b' \t\n\r\f\v'))
+                yield seq_id.decode('latin-1'), _not_sequence.sub(b'', record[newline + 1:])
+            if not block:
+                return
+
+
+def search_patterns(definitions):
+    """ Regular expression of each unit size like in misa.pl: (unit size, expression)
+    """
+    return [(unit_size, re.compile('(([acgt]{{{}}})\\2{{{},}})'.format(unit_size, min_repeats - 1).encode(),
+                                   re.IGNORECASE))
+            for unit_size, min_repeats in definitions]
+
+
+def is_redundant(motif):
+    """ True if the motif is made of a shorter motif, e.g. TT or ACAC
+    """
+    unit_size = len(motif)
+    return any(unit_size % j == 0 and motif == motif[:j] * (unit_size // j) for j in range(1, unit_size))
+
+
+def find_ssrs(seq, patterns, redundant=None):
+    """ Perfect SSRs of a sequence in the order of misa.pl (by unit size, then position)
+
+    Returns a list of (motif, number of repeats, start, end), start and end
+    1-based like in the MISA-file. redundant is a dictionary to cache the
+    results of is_redundant().
+    """
+    if redundant is None:
+        redundant = {}
+    ssrs = []
+    for unit_size, pattern in patterns:
+        for m in pattern.finditer(seq):
+            motif = m.group(2).upper().decode()
+            if motif not in redundant:
+                redundant[motif] = is_redundant(motif)
+            if redundant[motif]:
+                continue
+            ssrs.append((motif, (m.end() - m.start()) // unit_size, m.start() + 1, m.end()))
+    return ssrs
+
+
+def chunk_overlap(definitions):
+    """ Bases a chunk is scanned beyond its end to find each SSR starting in it
+    """
+    return max([unit_size * min_repeats for unit_size, min_repeats in definitions] + [0])
+
+
+def split_chunks(seq_length, chunk_size):
+    """ Start and end of the chunks of a sequence
+    """
+    return [(start, min(start + chunk_size, seq_length)) for start in range(0, seq_length, chunk_size)]
+
+
+def scan_chunk(task):
+    """ Matches of each unit size in a chunk, the search starting at the chunk
+
+    task is (bases of the chunk and the overlap, start of the chunk, end of
+    the chunk, definitions). Returns the end of the scanned bases and for
+    each unit size an array of start, end, start, end, ... of the matches
+    starting in the chunk, also of redundant motifs.
+    """
+    data, offset, stop, definitions = task
+    result = []
+    for unit_size, pattern in search_patterns(definitions):
+        matches = array.array('Q')
+        for m in pattern.finditer(data):
+            if m.start() + offset >= stop:
+                break
+            matches.append(m.start() + offset)
+            matches.append(m.end() + offset)
+        result.append(matches)
+    return offset + len(data), result
+
+
+def scan_range(seq, pattern, pos, stop):
+    """ Start and end of the matches starting from pos before stop
+    """
+    for m in pattern.finditer(seq, pos):
+        if m.start() >= stop:
+            return
+        yield m.start(), m.end()
+
+
+def join_chunks(seq, patterns, chunks, results, redundant):
+    """ Perfect SSRs of a sequence from the scans of its chunks, the same as find_ssrs()
+
+    The search of each unit size goes on at the end of the last SSR (pos),
+    like in one scan of the whole sequence. The scan of a chunk started at
+    the chunk is used from the first match at or after pos, unless one of
+    its matches spans pos; then the chunk is scanned again from pos.
+    """
+    ssrs = []
+    for i, (unit_size, pattern) in enumerate(patterns):
+        pos = 0
+        for (start, stop), (scanned_end, result) in zip(chunks, results):
+            if pos >= stop:
+                continue
+            matches = []
+            for k in range(0, len(result[i]), 2):
+                begin, end = result[i][k], result[i][k + 1]
+                if end + unit_size > scanned_end and scanned_end < len(seq):
+                    # the SSR may go on beyond the scanned bases
+                    end = pattern.match(seq, begin).end()
+                matches.append((begin, end))
+            if any(begin < pos < end for begin, end in matches):
+                matches = list(scan_range(seq, pattern, pos, stop))
+            for begin, end in matches:
+                if begin < pos:
+                    continue
+                motif = seq[begin:begin + unit_size].upper().decode()
+                if motif not in redundant:
+                    redundant[motif] = is_redundant(motif)
+                if not redundant[motif]:
+                    ssrs.append((motif, (end - begin) // unit_size, begin + 1, end))
+                pos = end
+    return ssrs
+
+
+def find_ssrs_parallel(records, definitions, pool, jobs, chunk_size, redundant):
+    """ Id, sequence and perfect SSRs of each record, the chunks scanned by the pool
+
+    The records are taken in batches of about jobs chunks, so short
+    sequences are scanned in parallel too.
+    """
+    patterns = search_patterns(definitions)
+    overlap = chunk_overlap(definitions)
+    batch = []
+    batch_size = 0
+    records = iter(records)
+    while True:
+        record = next(records, None)
+        if record is not None:
+            batch.append(record)
+            batch_size += len(record[1])
+            if batch_size < jobs * chunk_size:
+                continue
+        tasks = []
+        all_chunks = []
+        for seq_id, seq in batch:
+            chunks = split_chunks(len(seq), chunk_size)
+            all_chunks.append(chunks)
+            tasks.extend((seq[start:stop + overlap], start, stop, definitions) for start, stop in chunks)
+        results = pool.map(scan_chunk, tasks, 1) if tasks else []
+        k = 0
+        for (seq_id, seq), chunks in zip(batch, all_chunks):
+            yield seq_id, seq, join_chunks(seq, patterns, chunks, results[k:k + len(chunks)], redundant)
+            k += len(chunks)
+        if record is None:
+            return
+        batch = []
+        batch_size = 0
+
+
+def combine(ssrs, seq, interruptions):
+    """ Entries of the MISA-file of the SSRs of a sequence
+
+    SSRs with at most interruptions bases between them are joined into
+    compound SSRs exactly like misa.pl joins them. Returns a list of (SSR
+    type, SSR, start, end) and the number of SSRs joined to a previous one.
+    """
+    # like misa.pl sort by start; SSRs starting at the same base (possible
+    # only with small minimum numbers of repeats) stay in the order of unit
+    # size, misa.pl takes them in the random order of a Perl hash
+    order = sorted(ssrs, key=lambda ssr: ssr[2])
+    space = interruptions + 1
+    entries = []
+    num_joined = 0
+    i = 0
+    while i < len(order):
+        motif, repeats, start, end = order[i]
+        if i + 1 == len(order) or order[i + 1][2] - end > space:
+            # last or single SSR
+            entries.append(("p{}".format(len(motif)), "({}){}".format(motif, repeats), start, end))
+            i += 1
+            continue
+        ssrtype = 'c'
+        ssrseq = "({}){}".format(motif, repeats)
+        # join the following SSRs, each with a distance to the previous SSR
+        # (not to the end of the compound SSR) of at most space
+        while True:
+            next_motif, next_repeats, next_start, next_end = order[i + 1]
+            num_joined += 1
+            if next_start - order[i][3] < 1:
+                ssrtype = 'c*'
+                ssrseq += "({}){}*".format(next_motif, next_repeats)
+            else:
+                interssr = seq[order[i][3]:next_start - 1].lower().decode('latin-1')
+                ssrseq += "{}({}){}".format(interssr, next_motif, next_repeats)
+            end = next_end
+            i += 1
+            if i + 1 == len(order) or order[i + 1][2] - order[i][3] > space:
+                break
+        entries.append((ssrtype, ssrseq, start, end))
+        i += 1
+    return entries, num_joined
+
+
+def new_counts():
+    """ Counts of the MISA-statistics-file, see add_sequence()
+    """
+    return {
+        'num_sequences': 0,
+        'size_sequences': 0,
+        # number of sequences by number of SSRs in the sequence
+        'ssr_containing': Counter(),
+        'ssr_in_compound': 0,
+        # number of SSRs by unit size, by motif and by (motif, repeats)
+        'unit_size': Counter(),
+        'motifs': Counter(),
+        'motif_repeats': Counter(),
+    }
+
+
+def add_sequence(counts, seq_length, ssrs, num_joined):
+    """ Add the SSRs of one sequence to the counts
+    """
+    counts['num_sequences'] += 1
+    counts['size_sequences'] += seq_length
+    if ssrs:
+        counts['ssr_containing'][len(ssrs)] += 1
+    counts['ssr_in_compound'] += num_joined
+    for motif, repeats, start, end in ssrs:
+        counts['unit_size'][len(motif)] += 1
+        counts['motifs'][motif] += 1
+        counts['motif_repeats'][(motif, repeats)] += 1
+
+
+def write_statistics(outfile, fastafile, definitions, interruptions, counts):
+    """ Write the MISA-statistics-file like misa.pl
+    """
+    min_reps = dict(definitions)
+    motif_key = lambda motif: (len(motif), motif)
+    outfile.write("Specifications\n==============\n\nSequence source file: \"{}\"\n\n".format(fastafile))
+    outfile.write("Definement of microsatellites (unit size / minimum number of repeats):\n")
+    outfile.write("".join("({}/{}) ".format(unit_size, min_repeats) for unit_size, min_repeats in definitions))
+    outfile.write("\n")
+    if interruptions > 0:
+        outfile.write("\nMaximal number of bases interrupting 2 SSRs in a compound microsatellite:  {}\n".format(
+            interruptions))
+    outfile.write("\n\n\n")
+
+    # misa.pl prints nothing for numbers never set
+    num_sequences = counts['num_sequences']
+    total = sum(counts['unit_size'].values())
+    ssr_containing = sum(counts['ssr_containing'].values())
+    outfile.write("RESULTS OF MICROSATELLITE SEARCH\n================================\n\n")
+    outfile.write("Total number of sequences examined:              {}\n".format(num_sequences or ''))
+    outfile.write("Total size of examined sequences (bp):           {}\n".format(
+        counts['size_sequences'] if num_sequences else ''))
+    outfile.write("Total number of identified SSRs:                 {}\n".format(total if counts['unit_size'] else ''))
+    outfile.write("Number of SSR containing sequences:              {}\n".format(ssr_containing))
+    outfile.write("Number of sequences containing more than 1 SSR:  {}\n".format(
+        ssr_containing - counts['ssr_containing'][1]))
+    outfile.write("Number of SSRs present in compound formation:    {}\n\n\n".format(counts['ssr_in_compound']))
+
+    outfile.write("Distribution to different repeat type classes\n---------------------------------------------\n\n")
+    outfile.write("Unit size\tNumber of SSRs\n")
+    for unit_size in sorted(counts['unit_size']):
+        outfile.write("{}\t{}\n".format(unit_size, counts['unit_size'][unit_size]))
+    outfile.write("\n")
+
+    # range of the columns of repeats, misa.pl sets the minimum while reading sequences
+    min_repeats = min(min_reps.values()) if num_sequences and min_reps else 1000
+    max_repeats = max([1] + [repeats for motif, repeats in counts['motif_repeats']])
+    columns = range(min_repeats, max_repeats + 1)
+    header = "Repeats" + "".join("\t{}".format(repeats) for repeats in columns) + "\ttotal\n"
+
+    def write_row(name, unit_size, numbers, total):
+        cells = []
+        for repeats in columns:
+            if repeats < min_reps[unit_size]:
+                cells.append("-")
+            else:
+                cells.append(str(numbers[repeats]) if numbers.get(repeats) else "")
+        outfile.write(name + "".join("\t" + cell for cell in cells) + "\t{}\n".format(total))
+
+    by_motif = {}
+    for (motif, repeats), number in counts['motif_repeats'].items():
+        by_motif.setdefault(motif, Counter())[repeats] += number
+    outfile.write("Frequency of identified SSR motifs\n----------------------------------\n\n")
+    outfile.write(header)
+    for motif in sorted(counts['motifs'], key=motif_key):
+        write_row(motif, len(motif), by_motif[motif], counts['motifs'][motif])
+    outfile.write("\n")
+
+    by_class = {}
+    for motif in by_motif:
+        by_class.setdefault(motifclass.motif_class(motif), Counter()).update(by_motif[motif])
+    outfile.write("Frequency of classified repeat types (considering sequence complementary)\n"
+                  "-------------------------------------------------------------------------\n\n")
+    outfile.write(header)
+    for name in sorted(by_class, key=motif_key):
+        numbers = by_class[name]
+        write_row(name, (len(name) - 1) // 2, numbers, sum(numbers.values()))
+
+
+def search(fastafile, misafile, statisticsfile, definitions, interruptions, jobs=1,
+           chunk_size=default_chunk_size):
+    """ Search the SSRs of the FASTA file and write the MISA-file and the MISA-statistics-file
+
+    With jobs > 1 the chunks of the sequences are scanned in parallel.
+    """
+    patterns = search_patterns(definitions)
+    redundant = {}
+    counts = new_counts()
+    pool = None
+    if jobs > 1:
+        # imported only with worker processes, so the program starts faster
+        import multiprocessing
+        pool = multiprocessing.Pool(jobs)
+        found = find_ssrs_parallel(read_records(fastafile), definitions, pool, jobs, chunk_size, redundant)
+    else:
+        found = ((seq_id, seq, find_ssrs(seq, patterns, redundant)) for seq_id, seq in read_records(fastafile))
+    try:
+        with fileio.open_output(misafile, 'w', encoding='latin-1', newline='\n') as outfile:
+            outfile.write(misa_header)
+            for seq_id, seq, ssrs in found:
+                entries, num_joined = combine(ssrs, seq, interruptions)
+                add_sequence(counts, len(seq), ssrs, num_joined)
+                for nr, (ssrtype, ssrseq, start, end) in enumerate(entries, 1):
+                    outfile.write("{}\t{}\t{}\t{}\t{}\t{}\t{}\n".format(seq_id, nr, ssrtype, ssrseq,
+                                                                        end - start + 1, start, end))
+    finally:
+        if pool is not None:
+            pool.terminate()
+    with fileio.open_output(statisticsfile, 'w', encoding='latin-1', newline='\n') as outfile:
+        write_statistics(outfile, fastafile, definitions, interruptions, counts)
+    return counts
+
+
+def first_difference(filename, reference):
+    """ Number of the first line differing between two files, None if equal
+    """
+    with open(filename, 'rb') as infile, open(reference, 'rb') as reffile:
+        nr = 0
+        for nr, (line, refline) in enumerate(zip(infile, reffile), 1):
+            if line != refline:
+                return nr
+        # one file may be longer
+        if infile.read(1) or reffile.read(1):
+            return nr + 1
+    return None
+
+
+def main(fastafile, inifile=None, compare=False, jobs=1, chunk_size=default_chunk_size, outname=None,
+         outname_statistics=None):
+    """Main function
+
+    outname and outname_statistics are the MISA-file and the
+    MISA-statistics-file, - for standard output, by default named after the
+    FASTA file. With compare the output is written into a temporary
+    directory and compared with the existing output files, returns True if
+    equal.
+    """
+    if inifile is None:
+        inifile = misaconfig.find_ini(fastafile)
+        if inifile is None:
+            raise ValueError("misa.ini not found")
+    definitions, interruptions = misaconfig.read_ini(inifile)
+    if fileio.is_stdio(fastafile) and (outname is None or outname_statistics is None):
+        raise ValueError("FASTA file from standard input needs the names of the output files")
+    misafile = outname or out_filename.format(fastafile)
+    statisticsfile = outname_statistics or out_filename_statistics.format(fastafile)
+    if compare and fileio.stdio_name in (misafile, statisticsfile):
+        raise ValueError("Output files to compare with can not be standard output")
+    if not compare:
+        search(fastafile, misafile, statisticsfile, definitions, interruptions, jobs, chunk_size)
+        return True
+
+    import tempfile
+    tmpdir = tempfile.mkdtemp()
+    try:
+        new_files = [os.path.join(tmpdir, 'out.misa'), os.path.join(tmpdir, 'out.statistics')]
+        search(fastafile, new_files[0], new_files[1], definitions, interruptions, jobs, chunk_size)
+        equal = True
+        for new_file, reference in zip(new_files, [misafile, statisticsfile]):
+            nr = first_difference(new_file, reference)
+            if nr is None:
+                print("{}: equal".format(reference))
+            else:
+                print("{}: differs in line {}".format(reference, nr))
+                equal = False
+        return equal
+    finally:
+        shutil.rmtree(tmpdir)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument("fastafile", help="file with the sequences (FASTA), - for standard input")
+    parser.add_argument("-ini", "--inifile",
+                        help="misa.ini with the definement of microsatellites, by default next to the FASTA file "
+                             "or in the working directory")
+    parser.add_argument("-cmp", "--compare", help="compare with the existing MISA-file and MISA-statistics-file",
+                        action="store_true")
+    parser.add_argument("-j", "--jobs", help="number of worker processes", type=int, default=1)
+    parser.add_argument("-ch", "--chunksize", help="bases of a chunk scanned by one worker (default {})".format(
+        default_chunk_size), type=int, default=default_chunk_size)
+    parser.add_argument("-o", "--out", help="MISA-file, - for standard output (default <FASTA-file>.misa)")
+    parser.add_argument("-os", "--outstatistics",
+                        help="MISA-statistics-file, - for standard output (default <FASTA-file>.statistics)")
+    args = parser.parse_args()
+    if args.chunksize < 1:
+        parser.error("chunk size must be at least 1")
+    try:
+        if not main(args.fastafile, args.inifile, args.compare, args.jobs, args.chunksize, args.out,
+                    args.outstatistics):
+            sys.exit(1)
+    except ValueError as e:
+        parser.error(str(e))
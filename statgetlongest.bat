@@ -1 +1 @@
-python %~dp0statgetlongest.py %1 %2
\ No newline at end of file
+python %~dp0statgetlongest.py %*
\ No newline at end of file
@@ -2,10 +2,18 @@
 """Find accessions of the longest repeats
 
 Usage:
-statgetlongest.py repeats_analysis.txt <MISA-file>
+statgetlongest.py repeats_analysis.txt <MISA-file> [-o <output-file>]
+statgetlongest.py <MISA-file> -k <number> [-pm|-pc] [-o <output-file>]
+
+With -k the k longest repeats of each mere (with -pm of each motif, with
+-pc of each motif class, e.g. AC/GT) are found directly in one pass over
+the MISA-file, without repeats_analysis.txt.
+
+One of the input files may be - for standard input, with -o - the output
+is written to standard output.
 
 Output:
-longest-sequences-list.txt
+longest-sequences-list.txt (or the file of -o)
 
 Author: Mario Nenno 2015
 Version: 2015-08-31
@@ -16,8 +24,13 @@ Copyright: see file LICENCE.txt
 import os
 import sys
 import time
+import heapq
 import argparse
 
+import fileio
+import misacache
+import motifclass
+
 # program version
 _version_ = '1.0'
 
@@ -28,7 +41,7 @@ meres = ['Mono', 'Di', 'Tri', 'Tetra', 'Penta', 'Hexa', 'Septa', 'Octa', 'Nona',
 
 
 def getlineslongest(analysisfile):
-    with open(analysisfile, "r") as infile:
+    with fileio.open_text(analysisfile) as infile:
         is_start = False
         lines_with_longest = []
         for line in infile:
@@ -87,36 +100,108 @@ def getsequencelines(filename, groupedrepeats):
     ssrtype2mere = {'p1': 'Mono', 'p2': 'Di', 'p3': 'Tri',  'p4': 'Tetra', 'p5': 'Penta',
                     'p6': 'Hexa', 'p7': 'Septa', 'p8': 'Octa', 'p9': 'Nona', 'p10': 'Deca'}
     groupedseqlines = {}
-    with open(filename, "r") as infile:
-        for line in infile:
-            line = line.rstrip()
-            items = line.split("\t")
-            #     ['PK14952.1', '1', 'p1', '(T)11', '11', '2418', '2428\n']
-            #  Idx  0            1    2      3
-            ssrtype = items[2]
-            if ssrtype in validssrtypes:
-                mere = ssrtype2mere[ssrtype]
-                ssr = items[3]
-                # search SSR in list of longest grouped by mere
-                if ssr in groupedrepeats[mere]:
-                    if mere in groupedseqlines.keys():
-                        listlines = groupedseqlines[mere]
-                        listlines.append(items)
-                        groupedseqlines[mere] = listlines
-                    else:
-                        listlines = []
-                        listlines.append(items)
-                        groupedseqlines[mere] = listlines
-        return groupedseqlines
-
-
-def printgroupedseqlines(grouped, analysisfile, misafile, execution_time):
-    with open(out_filename, 'w') as outfile:
+    # columns of the MISA file, from its cache if fresh
+    table = misacache.load_misa(filename)
+    # map code of ssr type to mere for valid ssr types
+    code2mere = {}
+    for code, ssrtype in enumerate(table.ssrtypes):
+        if ssrtype in validssrtypes:
+            code2mere[code] = ssrtype2mere[ssrtype]
+    # longest repeats as set for each mere
+    longest = {}
+    for mere in groupedrepeats:
+        longest[mere] = set(groupedrepeats[mere])
+    for i, (ssrtype_code, ssr_code) in enumerate(zip(table.ssrtype, table.ssr)):
+        if ssrtype_code in code2mere:
+            mere = code2mere[ssrtype_code]
+            ssr = table.ssrs[ssr_code]
+            # search SSR in list of longest grouped by mere
+            if ssr in longest.get(mere, ()):
+                #     ['PK14952.1', '1', 'p1', '(T)11', '11', '2418', '2428']
+                #  Idx  0            1    2      3
+                items = table.items(i)
+                if mere in groupedseqlines.keys():
+                    listlines = groupedseqlines[mere]
+                    listlines.append(items)
+                    groupedseqlines[mere] = listlines
+                else:
+                    listlines = []
+                    listlines.append(items)
+                    groupedseqlines[mere] = listlines
+    return groupedseqlines
+
+
+def toplongest(filename, k, per_motif=False, per_class=False):
+    """ The k longest perfect SSRs of each mere in one pass over the MISA-file
+
+    Returns a list of (mere, motif, list of items of a MISA line) in order
+    of meres, the SSRs ordered by length desc. With per_motif the SSRs are
+    grouped by mere and motif, with per_class by mere and class of the
+    motif (see motifclass.py), else motif is ''. Of SSRs with equal length
+    the first ones of the MISA-file are kept.
+    """
+    ssrtype2mere = {'p1': 'Mono', 'p2': 'Di', 'p3': 'Tri',  'p4': 'Tetra', 'p5': 'Penta',
+                    'p6': 'Hexa', 'p7': 'Septa', 'p8': 'Octa', 'p9': 'Nona', 'p10': 'Deca'}
+    # columns of the MISA file, from its cache if fresh
+    table = misacache.load_misa(filename)
+    code2mere = {}
+    for code, ssrtype in enumerate(table.ssrtypes):
+        if ssrtype in ssrtype2mere:
+            code2mere[code] = ssrtype2mere[ssrtype]
+    # name of the group of each motif code
+    if per_motif:
+        code2group = table.motifs
+    elif per_class:
+        code2group = [motifclass.motif_class(motif) if motif else '' for motif in table.motifs]
+    else:
+        code2group = [''] * len(table.motifs)
+    # min-heap of (size, -row) for each group, the root is the shortest SSR kept
+    heaps = {}
+    for i, (ssrtype_code, motif_code, size) in enumerate(zip(table.ssrtype, table.motif, table.size)):
+        if ssrtype_code in code2mere:
+            group = (code2mere[ssrtype_code], code2group[motif_code])
+            heap = heaps.get(group)
+            if heap is None:
+                heap = heaps[group] = []
+            entry = (size, -i)
+            if len(heap) < k:
+                heapq.heappush(heap, entry)
+            elif entry > heap[0]:
+                heapq.heapreplace(heap, entry)
+    groups = []
+    for mere, motif in sorted(heaps, key=lambda g: (meres.index(g[0]), g[1])):
+        rows = sorted(heaps[(mere, motif)], reverse=True)
+        groups.append((mere, motif, [table.items(-j) for size, j in rows]))
+    return groups
+
+
+def printtoplongest(groups, misafile, k, execution_time, outname=out_filename):
+    with fileio.open_output(outname) as outfile:
+        outfile.write("Program: {} {}\n".format(os.path.basename(sys.argv[0]), _version_))
+        outfile.write("Date: {} Execution time: {:.2f} sec\n".format(time.strftime("%Y-%m-%d %H:%M"), execution_time))
+        outfile.write("Input file of sequences: {}\n".format(misafile))
+        outfile.write("Longest repeats: {}\n".format(k))
+        outfile.write("Output: {}\n".format(outname))
+        outfile.write("="*50 + "\n")
+        for mere, motif, list_items in groups:
+            if motif:
+                outfile.write("----- {} {}\n".format(mere, motif))
+            else:
+                outfile.write("----- {}\n".format(mere))
+            for items in list_items:
+                #     ['PK14952.1', '1', 'p1', '(T)11', '11', '2418', '2428\n']
+                #  Idx  0            1    2      3       4
+                seqline = "{} {}: {}\n".format(items[3], items[4], items[0])
+                outfile.write(seqline)
+
+
+def printgroupedseqlines(grouped, analysisfile, misafile, execution_time, outname=out_filename):
+    with fileio.open_output(outname) as outfile:
         outfile.write("Program: {} {}\n".format(os.path.basename(sys.argv[0]), _version_))
         outfile.write("Date: {} Execution time: {:.2f} sec\n".format(time.strftime("%Y-%m-%d %H:%M"), execution_time))
         outfile.write("Input file of repeat analysis: {}\n".format(analysisfile))
         outfile.write("Input file of sequences: {}\n".format(misafile))
-        outfile.write("Output: {}\n".format(out_filename))
+        outfile.write("Output: {}\n".format(outname))
         outfile.write("="*50 + "\n")
         for mere in meres:
             if mere in grouped:
@@ -128,11 +213,18 @@ def printgroupedseqlines(grouped, analysisfile, misafile, execution_time):
                     outfile.write(seqline)
 
 
-def main(analysisfile, misafile):
+def main(analysisfile, misafile, lines_with_longest=None, outname=out_filename):
+    """Main function
+
+    lines_with_longest are the lines of the longest motives of the
+    analysis file, if already in memory (see pyssrstat.py). Returns the
+    repeats as items of a MISA line grouped by mere.
+    """
     # Start timing
     start_time = time.time()
 
-    lines_with_longest = getlineslongest(analysisfile)
+    if lines_with_longest is None:
+        lines_with_longest = getlineslongest(analysisfile)
     groupedrepeats = create_repeat_names(lines_with_longest)
     groupedseqlines = getsequencelines(misafile, groupedrepeats)
 
@@ -140,13 +232,50 @@ def main(analysisfile, misafile):
     execution_time = time.time() - start_time
 
     # write to output
-    printgroupedseqlines(groupedseqlines, analysisfile, misafile, execution_time)
+    printgroupedseqlines(groupedseqlines, analysisfile, misafile, execution_time, outname)
+    return groupedseqlines
+
+
+def main_top(misafile, k, per_motif, per_class=False, outname=out_filename):
+    """ The k longest repeats without analysis file, returns the groups of toplongest()
+    """
+    # Start timing
+    start_time = time.time()
+
+    groups = toplongest(misafile, k, per_motif, per_class)
+
+    # End timing
+    execution_time = time.time() - start_time
+
+    # write to output
+    printtoplongest(groups, misafile, k, execution_time, outname)
+    return groups
 
 
 if __name__ == '__main__':
     parser = argparse.ArgumentParser()
-    parser.add_argument("analysisfile", help="file with output from statistics_misa")
-    parser.add_argument("misafile", help="file with sequences and repeats")
+    parser.add_argument("files", nargs="+", metavar="file",
+                        help="file with output from statistics_misa and file with sequences and repeats "
+                             "(MISA-file), with -k only the MISA-file")
+    parser.add_argument("-k", "--top", help="find the k longest repeats directly in the MISA-file", type=int)
+    parser.add_argument("-pm", "--permotif", help="with -k the k longest repeats of each motif",
+                        action="store_true")
+    parser.add_argument("-pc", "--perclass", help="with -k the k longest repeats of each motif class",
+                        action="store_true")
+    parser.add_argument("-o", "--out", help="output file, - for standard output (default {})".format(out_filename),
+                        default=out_filename)
     args = parser.parse_args()
-    if args.analysisfile and args.misafile:
-        main(args.analysisfile, args.misafile)
\ No newline at end of file
+    if args.files.count(fileio.stdio_name) > 1:
+        parser.error("only one file can be read from standard input")
+    if args.top is not None:
+        if len(args.files) != 1:
+            parser.error("with -k only the MISA-file is needed")
+        if args.top < 1:
+            parser.error("-k must be at least 1")
+        if args.permotif and args.perclass:
+            parser.error("-pm and -pc can not be used together")
+        main_top(args.files[0], args.top, args.permotif, args.perclass, args.out)
+    else:
+        if len(args.files) != 2:
+            parser.error("the file with output from statistics_misa and the MISA-file are needed")
+        main(args.files[0], args.files[1], outname=args.out)
\ No newline at end of file
@@ -1 +1 @@
-python %~dp0statistics_misa.py %1 %2 %3
\ No newline at end of file
+python %~dp0statistics_misa.py %*
\ No newline at end of file
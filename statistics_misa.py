@@ -9,10 +9,30 @@ containing data form the MISA statistic file and
 - number of perfect, imperfect and compound SSRs (experimental)
 
 Usage:
-statistics_misa.py <MISA-statstic-file> <MISA-file> [-rpc|--repeatclassses]
+statistics_misa.py <MISA-statstic-file> <MISA-file> [-rpc|--repeatclassses] [-dm] [-o <output-file>]
+                   [-od <prefix>]
+statistics_misa.py <MISA-file> -db <db-file> [-ini misa.ini] [-rpc|--repeatclassses] [-dm] [-pa]
+                   [-o <output-file>] [-od <prefix>]
+
+With -db the numbers of the MISA-statistic-file are calculated from the
+MISA-file and the index of the db file, the MISA-statistic-file is not
+needed. With -pa only the counts of SSRs are written into
+repeats_partial.txt, the partial statistics of several MISA-files are
+merged with mergestatistics.py.
+
+With -dm the numbers of SSRs by motif class and number of repeats, and by
+unit size and length of the SSR are written as matrices, each as tab
+separated text and as binary array. Their file names start with the prefix
+of -od (default repeats_distribution).
+
+One of the input files may be - for standard input, with -o - the output
+is written to standard output.
 
 Output:
 repeats_analysis.txt
+repeats_partial.txt (with -pa, instead of repeats_analysis.txt)
+repeats_distribution_class.tsv, repeats_distribution_class.bin (with -dm)
+repeats_distribution_unit.tsv, repeats_distribution_unit.bin (with -dm)
 
 Author: Mario Nenno
 Version: 2015-08-31
@@ -24,35 +44,71 @@ import os
 import time
 import sys
 import argparse
+import array
 import re
-from collections import OrderedDict
+import struct
+from collections import Counter, OrderedDict
+
+import fastaindex
+import filecache
+import fileio
+import misacache
+import misaconfig
+import motifclass
 
 # program version
 _version_ = '1.0'
 
 # output file
 out_filename = 'repeats_analysis.txt'
+# output file of partial statistics
+out_filename_partial = 'repeats_partial.txt'
 
+# first line of a file of partial statistics
+partial_magic = 'PySSRstat partial statistics'
+partial_version = 1
 
-def main(statisticsfile, misafile, repeatclasses):
-    """Main function contains all logic
-    """
-    # Names of the repeat length
-    mono = 'Mono'
-    di = 'Di'
-    tri = 'Tri'
-    tetra = 'Tetra'
-    penta = 'Penta'
-    hexa = 'Hexa'
-    septa = 'Septa'
-    octa = 'Octa'
-    nona = 'Nona'
-    deca = 'Deca'
+# output files of the distribution matrices, by prefix, name and format
+out_filename_distribution = '{}_{}.{}'
+out_prefix_distribution = 'repeats_distribution'
+
+# header of a binary distribution matrix: magic, number of rows and columns
+matrix_magic = b'PYSSRMAT'
+_matrix_header = struct.Struct('<8sII')
+
+
+# Mapping repeat length to name
+repeat_len_name = {1: 'Mono', 2: 'Di', 3: 'Tri', 4: 'Tetra', 5: 'Penta', 6: 'Hexa', 7: 'Septa', 8: 'Octa', 9: 'Nona',
+                   10: 'Deca'}
+
+
+def get_num_right(part):
+    text, num = part.split(":")
+    num.rstrip().lstrip()
+    num = int(num)
+    return num
 
-    definement_line = ''
 
-    # Mapping repeat length to name
-    repeat_len_name = {1: mono, 2: di, 3: tri, 4: tetra, 5: penta, 6: hexa, 7: septa, 8: octa, 9: nona, 10: deca}
+def parse_definement(line_definement):
+    # get list of Definement of microsatellites (unit size / minimum number of repeats)
+    list_definements = []
+    # extract by regex
+    pattern = re.compile(r'\((\d+)/(\d+)\)')
+    for pair in line_definement.split():
+        m = pattern.match(pair)
+        # group to tuple
+        t = (int(m.group(1)), int(m.group(2)))
+        # add tuple to list
+        list_definements.append(t)
+    return list_definements
+
+
+def read_statistics(statisticsfile):
+    """ Read the numbers of the MISA-statistics-file used for the analysis
+
+    Returns a dictionary, see calc_statistics().
+    """
+    definement_line = ''
 
     total_length_examined_misa = 0
     total_number_ssr_misa = 0
@@ -78,50 +134,8 @@ def main(statisticsfile, misafile, repeatclasses):
     longest_motifs["C"] = 0
     longest_motifs["G"] = 0
 
-    # take start time to calc duration later
-    start_time = time.time()
-
-    def percent_abundance(abund, total):
-        return (abund*100)/total
-
-    def get_num_right(part):
-        text, num = part.split(":")
-        num.rstrip().lstrip()
-        num = int(num)
-        return num
-
-    def percent_repeat(d):
-        percents = {}
-        sum_of_grp = 0
-        for k in d:
-            sum_of_grp += int(d[k])
-        for k in d:
-            abund = int(d[k])
-            # sum_of_grp = 100%
-            # ab  = x%   = (ab*100)/sum_of_grp
-            pc = (abund*100)/sum_of_grp
-            percents[k] = pc
-        return percents
-
-    def list_as_string(a_list):
-        # Sort the list before joining
-        return ', '.join([str(x) for x in sorted(a_list)])
-
-    def parse_definement(line_definement):
-        # get list of Definement of microsatellites (unit size / minimum number of repeats)
-        list_definements = []
-        # extract by regex
-        pattern = re.compile(r'\((\d+)/(\d+)\)')
-        for pair in line_definement.split():
-            m = pattern.match(pair)
-            # group to tuple
-            t = (int(m.group(1)), int(m.group(2)))
-            # add tuple to list
-            list_definements.append(t)
-        return list_definements
-
     # Read from the MISA statistics file
-    with open(statisticsfile, "r") as infile:
+    with fileio.open_text(statisticsfile) as infile:
         idx_definement = 0
         for line in infile:
             if line.startswith("Definement of microsatellites"):
@@ -221,6 +235,329 @@ def main(statisticsfile, misafile, repeatclasses):
                         if repeat_type != "Repeats":
                             total_abundance[repeat_type] = list_of_data[-1]
 
+    return {'definement_line': definement_line, 'max_repeat_unit_length': max_repeat_unit_length,
+            'total_length_examined': total_length_examined_misa, 'total_number_ssr': total_number_ssr_misa,
+            'total_ssr_in_compound': total_ssr_in_compound_misa, 'abundances': abundances,
+            'longest_motifs': longest_motifs, 'total_abundance': total_abundance}
+
+
+def count_ssrtypes(table):
+    """ Number of perfect (p), imperfect (c) and compound (c*) SSRs of a MISA table
+    """
+    num_ssrtypes = {'p': 0, 'c': 0, 'c*': 0}
+    num_of_type = Counter(table.ssrtype)
+    for code, ssrtype in enumerate(table.ssrtypes):
+        if 'c' == ssrtype:
+            num_ssrtypes['c'] += num_of_type[code]
+        elif 'c*' == ssrtype:
+            num_ssrtypes['c*'] += num_of_type[code]
+        elif ssrtype.startswith("p"):
+            num_ssrtypes['p'] += num_of_type[code]
+    return num_ssrtypes
+
+
+def count_misa(misafile, dbfile=None):
+    """ Count the SSRs of the MISA-file, the raw numbers of the statistics
+
+    The SSRs of compound SSRs are counted like MISA counts them. The total
+    length of the sequences is taken from the index of the db file (see
+    fastaindex.py), without db file it is 0. Counts of several MISA-files can be added (see
+    merge_counts()). Returns a dictionary with
+
+    motif_repeats         - number of SSRs by (motif, number of repeats)
+    total_ssr_in_compound - number of SSRs present in compound formation
+    total_length_examined - total length of the sequences (bp)
+    num_ssrtypes          - number of perfect, imperfect and compound SSRs
+    """
+    # columns of the MISA file, from its cache if fresh
+    table = misacache.load_misa(misafile)
+    perfect_codes = set(code for code, ssrtype in enumerate(table.ssrtypes) if ssrtype.startswith("p"))
+
+    # number of SSRs by (motif, repeats), perfect SSRs counted by their codes
+    motif_repeats = Counter()
+    for (ssrtype_code, motif_code, repeats), number in Counter(zip(table.ssrtype, table.motif,
+                                                                    table.repeats)).items():
+        if ssrtype_code in perfect_codes:
+            motif_repeats[(table.motifs[motif_code], repeats)] += number
+    # SSRs of imperfect and compound SSRs, each unique SSR string is parsed once
+    total_ssr_in_compound = 0
+    for (ssrtype_code, ssr_code), number in Counter(zip(table.ssrtype, table.ssr)).items():
+        if ssrtype_code not in perfect_codes:
+            components = misacache.ssr_components(table.ssrs[ssr_code])
+            for motif, repeats in components:
+                motif_repeats[(motif, repeats)] += number
+            # MISA counts all but the first SSR of a compound
+            total_ssr_in_compound += number * (len(components) - 1)
+
+    total_length_examined = 0
+    if dbfile is not None:
+        index = fastaindex.load_index(dbfile)
+        total_length_examined = sum(record[0] for record in index.values())
+
+    return {'motif_repeats': motif_repeats, 'total_ssr_in_compound': total_ssr_in_compound,
+            'total_length_examined': total_length_examined, 'num_ssrtypes': count_ssrtypes(table)}
+
+
+def merge_counts(list_counts):
+    """ Add the counts of several MISA-files (see count_misa())
+    """
+    merged = {'motif_repeats': Counter(), 'total_ssr_in_compound': 0, 'total_length_examined': 0,
+              'num_ssrtypes': {'p': 0, 'c': 0, 'c*': 0}}
+    for counts in list_counts:
+        merged['motif_repeats'].update(counts['motif_repeats'])
+        merged['total_ssr_in_compound'] += counts['total_ssr_in_compound']
+        merged['total_length_examined'] += counts['total_length_examined']
+        for ssrtype in merged['num_ssrtypes']:
+            merged['num_ssrtypes'][ssrtype] += counts['num_ssrtypes'][ssrtype]
+    return merged
+
+
+def read_definitions(inifile, *filenames):
+    """ Definement of microsatellites from misa.ini, None if no misa.ini is found
+
+    Without inifile misa.ini is searched next to the files.
+    """
+    if inifile is None:
+        inifile = misaconfig.find_ini(*filenames)
+    if inifile is None:
+        return None
+    definitions, interruptions = misaconfig.read_ini(inifile)
+    return definitions
+
+
+def statistics_from_counts(counts, definitions=None):
+    """ The numbers of the MISA-statistics-file calculated from the counts of SSRs
+
+    definitions is the definement of microsatellites, a list of (unit
+    size, minimum number of repeats). If None the unit sizes found are used.
+    Returns a dictionary with
+
+    definement_line        - definement of microsatellites, e.g. (1/10) (2/6)
+    max_repeat_unit_length - largest unit size
+    total_length_examined  - total length of the sequences (bp)
+    total_number_ssr       - total number of SSRs
+    total_ssr_in_compound  - number of SSRs present in compound formation
+    abundances             - number of SSRs by name of the unit size
+    longest_motifs         - largest number of repeats by motif
+    total_abundance        - number of SSRs by class of motifs, e.g. AC/GT
+    num_ssrtypes           - number of perfect, imperfect and compound SSRs
+    """
+    motif_repeats = counts['motif_repeats']
+    definement_line = ''
+    if definitions is not None:
+        definement_line = misaconfig.definement_line(definitions)
+    else:
+        unit_sizes = set(len(motif) for motif, repeats in motif_repeats)
+        definitions = [(unit_size, 0) for unit_size in range(1, max(unit_sizes | {1}) + 1)]
+    max_repeat_unit_length = definitions[-1][0]
+
+    abundances = dict((repeat_len_name[unit_size], 0) for unit_size, min_repeats in definitions)
+    longest_motifs = {"A": 0, "T": 0, "C": 0, "G": 0}
+    total_abundance = Counter()
+    motif_classes = {}
+    for (motif, repeats), number in motif_repeats.items():
+        abundances[repeat_len_name[len(motif)]] += number
+        if repeats > longest_motifs.get(motif, 0):
+            longest_motifs[motif] = repeats
+        if motif not in motif_classes:
+            motif_classes[motif] = motifclass.motif_class(motif)
+        total_abundance[motif_classes[motif]] += number
+
+    return {'definement_line': definement_line, 'max_repeat_unit_length': max_repeat_unit_length,
+            'total_length_examined': counts['total_length_examined'],
+            'total_number_ssr': sum(motif_repeats.values()),
+            'total_ssr_in_compound': counts['total_ssr_in_compound'], 'abundances': abundances,
+            'longest_motifs': longest_motifs, 'total_abundance': dict(total_abundance),
+            'num_ssrtypes': counts['num_ssrtypes']}
+
+
+def calc_statistics(misafile, dbfile, inifile=None):
+    """ Calculate the numbers of the MISA-statistics-file from the MISA-file and the db file
+
+    The definement of microsatellites is read from misa.ini, without
+    misa.ini the unit sizes found in the MISA-file are used. Returns a
+    dictionary, see statistics_from_counts().
+    """
+    return statistics_from_counts(count_misa(misafile, dbfile), read_definitions(inifile, misafile))
+
+
+def write_partial(counts, definitions, misafile, dbfile, filename=out_filename_partial):
+    """ Write the counts of SSRs of a MISA-file (partial statistics) to be merged later
+
+    Lines of tab separated values: a key and its values.
+    """
+    with fileio.open_output(filename) as outfile:
+        outfile.write("{}\t{}\n".format(partial_magic, partial_version))
+        outfile.write("misafile\t{}\n".format(misafile))
+        outfile.write("dbfile\t{}\n".format(dbfile))
+        if definitions is not None:
+            outfile.write("definition\t{}\n".format(
+                "\t".join("{}-{}".format(unit_size, min_repeats) for unit_size, min_repeats in definitions)))
+        outfile.write("total_length_examined\t{}\n".format(counts['total_length_examined']))
+        outfile.write("total_ssr_in_compound\t{}\n".format(counts['total_ssr_in_compound']))
+        for ssrtype in ['p', 'c', 'c*']:
+            outfile.write("ssrtype\t{}\t{}\n".format(ssrtype, counts['num_ssrtypes'][ssrtype]))
+        for (motif, repeats), number in sorted(counts['motif_repeats'].items()):
+            outfile.write("motif\t{}\t{}\t{}\n".format(motif, repeats, number))
+
+
+def read_partial(filename):
+    """ Read partial statistics, returns the counts and the definitions (None if not given)
+    """
+    counts = {'motif_repeats': Counter(), 'total_ssr_in_compound': 0, 'total_length_examined': 0,
+              'num_ssrtypes': {'p': 0, 'c': 0, 'c*': 0}}
+    definitions = None
+    with fileio.open_text(filename) as infile:
+        first = infile.readline().rstrip("\n").split("\t")
+        if first[0] != partial_magic or int(first[1]) != partial_version:
+            raise ValueError("File '{}' is not a file of partial statistics".format(filename))
+        for line in infile:
+            items = line.rstrip("\n").split("\t")
+            key = items[0]
+            if key == 'definition':
+                definitions = [tuple(int(n) for n in pair.split("-")) for pair in items[1:]]
+            elif key in ('total_length_examined', 'total_ssr_in_compound'):
+                counts[key] = int(items[1])
+            elif key == 'ssrtype':
+                counts['num_ssrtypes'][items[1]] = int(items[2])
+            elif key == 'motif':
+                counts['motif_repeats'][(items[1], int(items[2]))] = int(items[3])
+    return counts, definitions
+
+
+def distribution_matrices(motif_repeats):
+    """ Number of SSRs by motif class and number of repeats, and by unit size and length of the SSR
+
+    motif_repeats is the number of SSRs by (motif, number of repeats), see
+    count_misa(). Returns a list of the two matrices, each a tuple (name,
+    label of the rows, labels of the rows, labels of the columns, array of
+    the numbers row by row).
+    """
+    # numbers by (row label, column label) of each matrix
+    by_class = Counter()
+    by_unit_size = Counter()
+    motif_classes = {}
+    for (motif, repeats), number in motif_repeats.items():
+        if motif not in motif_classes:
+            motif_classes[motif] = motifclass.motif_class(motif)
+        by_class[(motif_classes[motif], repeats)] += number
+        by_unit_size[(len(motif), len(motif) * repeats)] += number
+
+    matrices = []
+    for name, row_label, numbers, sort_key in [('class', 'Motif class/Repeats', by_class, lambda c: (len(c), c)),
+                                               ('unit', 'Unit size/Length (bp)', by_unit_size, None)]:
+        rows = sorted(set(row for row, col in numbers), key=sort_key)
+        cols = list(range(min(col for row, col in numbers), max(col for row, col in numbers) + 1)) if numbers else []
+        row_idx = dict((row, i) for i, row in enumerate(rows))
+        matrix = array.array('Q', [0]) * (len(rows) * len(cols))
+        for (row, col), number in numbers.items():
+            matrix[row_idx[row] * len(cols) + col - cols[0]] = number
+        matrices.append((name, row_label, rows, cols, matrix))
+    return matrices
+
+
+def write_distributions(motif_repeats, prefix=out_prefix_distribution):
+    """ Write the distribution matrices as tab separated text and as binary array
+
+    The files are named <prefix>_<name>.tsv and <prefix>_<name>.bin.
+
+    The binary file holds the magic bytes, the number of rows and columns
+    (uint32) and the numbers row by row (uint64, little-endian); the labels
+    of rows and columns are those of the text file.
+    """
+    for name, row_label, rows, cols, matrix in distribution_matrices(motif_repeats):
+        with open(out_filename_distribution.format(prefix, name, 'tsv'), 'w') as outfile:
+            # the column labels are the number of repeats or the length in bp
+            outfile.write("\t".join([row_label] + [str(col) for col in cols]) + "\n")
+            for i, row in enumerate(rows):
+                numbers = matrix[i * len(cols):(i + 1) * len(cols)]
+                outfile.write("\t".join([str(row)] + [str(number) for number in numbers]) + "\n")
+        with open(out_filename_distribution.format(prefix, name, 'bin'), 'wb') as outfile:
+            outfile.write(_matrix_header.pack(matrix_magic, len(rows), len(cols)))
+            outfile.write(filecache.pack_array('Q', matrix))
+
+
+def main(statisticsfile, misafile, repeatclasses, dbfile=None, inifile=None, partial=False, distribution=False,
+         outname=None, outprefix_distribution=out_prefix_distribution):
+    """Main function
+
+    Without statisticsfile the numbers of the MISA-statistics-file are
+    calculated from the MISA-file and the db file (see calc_statistics()).
+    With partial only the counts of the SSRs are written to be merged
+    later (see mergestatistics.py). With distribution the distribution
+    matrices are written too, with the file names starting with
+    outprefix_distribution (see write_distributions()). outname is the
+    output file, - for standard output, by default repeats_analysis.txt or
+    repeats_partial.txt. Returns the lines of the longest motives (see
+    write_analysis()).
+    """
+    # take start time to calc duration later
+    start_time = time.time()
+
+    counts = None
+    if partial or distribution or statisticsfile is None:
+        counts = count_misa(misafile, dbfile if statisticsfile is None else None)
+
+    if partial:
+        write_partial(counts, read_definitions(inifile, misafile), misafile, dbfile, outname or out_filename_partial)
+        return
+
+    if distribution:
+        write_distributions(counts['motif_repeats'], outprefix_distribution)
+
+    if statisticsfile is not None:
+        stats = read_statistics(statisticsfile)
+        inputs = [("Statistic file analysed", statisticsfile)]
+        note = "Note: Numbers label with '(MISA)' are not calculated but read from input"
+    else:
+        stats = statistics_from_counts(counts, read_definitions(inifile, misafile))
+        inputs = [("Db file analysed", dbfile)]
+        note = "Note: Numbers label with '(MISA)' are calculated from the MISA file and the db file"
+    inputs.append(("Definement of microsatellites (MISA)", stats['definement_line']))
+    inputs.append(("Misa file analysed", misafile))
+    if repeatclasses and 'num_ssrtypes' not in stats:
+        if counts is not None:
+            stats['num_ssrtypes'] = counts['num_ssrtypes']
+        else:
+            # columns of the MISA file, from its cache if fresh
+            stats['num_ssrtypes'] = count_ssrtypes(misacache.load_misa(misafile))
+    return write_analysis(stats, inputs, note, repeatclasses, start_time, outname or out_filename)
+
+
+def write_analysis(stats, inputs, note, repeatclasses, start_time, outname=out_filename):
+    """ Analyse the numbers of the statistics and write them into the output file
+
+    inputs is a list of (label, value) describing the input files. Returns
+    the lines of the longest motives, as read by statgetlongest.py.
+    """
+    def percent_abundance(abund, total):
+        return (abund*100)/total
+
+    def percent_repeat(d):
+        percents = {}
+        sum_of_grp = 0
+        for k in d:
+            sum_of_grp += int(d[k])
+        for k in d:
+            abund = int(d[k])
+            # sum_of_grp = 100%
+            # ab  = x%   = (ab*100)/sum_of_grp
+            pc = (abund*100)/sum_of_grp
+            percents[k] = pc
+        return percents
+
+    def list_as_string(a_list):
+        # Sort the list before joining
+        return ', '.join([str(x) for x in sorted(a_list)])
+
+    max_repeat_unit_length = stats['max_repeat_unit_length']
+    total_length_examined_misa = stats['total_length_examined']
+    total_number_ssr_misa = stats['total_number_ssr']
+    total_ssr_in_compound_misa = stats['total_ssr_in_compound']
+    abundances = stats['abundances']
+    longest_motifs = stats['longest_motifs']
+    total_abundance = stats['total_abundance']
+
     # ----------------------  Analysis of longtest Motifs (Di, Tri, etc. ) ------------------------------
     # Longest motif length
     # initialize dict of longest all longest to 0
@@ -307,31 +644,20 @@ def main(statisticsfile, misafile, repeatclasses):
     num_imperfect_ssr = 0
     num_compound_ssr = 0
     if repeatclasses:
-        with open(misafile, "r") as infile:
-            for line in infile:
-                line = line.rstrip()
-                items = line.split("\t")
-                #     ['PK14952.1', '1', 'p1', '(T)11', '11', '2418', '2428\n']
-                #  Idx  0            1    2      3
-                ssrtype = items[2]
-                if 'c' == ssrtype:
-                    num_imperfect_ssr += 1
-                elif 'c*' == ssrtype:
-                    num_compound_ssr += 1
-                elif ssrtype.startswith("p"):
-                    num_perfect_ssr += 1
+        num_perfect_ssr = stats['num_ssrtypes']['p']
+        num_imperfect_ssr = stats['num_ssrtypes']['c']
+        num_compound_ssr = stats['num_ssrtypes']['c*']
 
     # End timing
     execution_time = time.time() - start_time
 
     # write result into output file
-    with open(out_filename, 'w') as outfile:
+    with fileio.open_output(outname) as outfile:
         outfile.write("Program: {} {}\n".format(os.path.basename(sys.argv[0]), _version_))
-        outfile.write("Statistic file analysed: {}\n".format(statisticsfile))
-        outfile.write("Definement of microsatellites (MISA): {}\n".format(definement_line))
-        outfile.write("Misa file analysed: {}\n".format(misafile))
+        for label, value in inputs:
+            outfile.write("{}: {}\n".format(label, value))
         outfile.write("Date: {} Execution time: {:.2f} sec\n".format(time.strftime("%Y-%m-%d %H:%M"), execution_time))
-        outfile.write("Note: Numbers label with '(MISA)' are not calculated but read from input\n")
+        outfile.write(note + "\n")
         if repeatclasses:
             outfile.write("Option repeatclasses: {}\n".format(repeatclasses))
         outfile.write("="*50 + "\n\n")
@@ -373,13 +699,15 @@ def main(statisticsfile, misafile, repeatclasses):
             outfile.write("                           Total : {:>8}\n".format(subtotal + total_ssr_in_compound_misa))
 
         outfile.write("\n======== Longest motives =======\n")
-        outfile.write("Mono  A: %d, T: %d, C: %d, G: %d\n" % (
-            longest_motifs["A"], longest_motifs["T"], longest_motifs["C"], longest_motifs["G"]))
+        longest_lines = ["Mono  A: %d, T: %d, C: %d, G: %d" % (
+            longest_motifs["A"], longest_motifs["T"], longest_motifs["C"], longest_motifs["G"])]
         # Di- to Deca
         for i in range(2, (max_repeat_unit_length + 1)):
-            outfile.write("{0:<5} {1:>5}: {2}\n".format(
+            longest_lines.append("{0:<5} {1:>5}: {2}".format(
                 repeat_len_name[i], longest_repeat[repeat_len_name[i]],
                 list_as_string(longest_repeat_motifs[repeat_len_name[i]])))
+        for line in longest_lines:
+            outfile.write(line + "\n")
 
         outfile.write("\n======= Total abundance of repeat types =======\n")
         out_format = "{0}: {1:5.1f}% ({2:>5})\n"
@@ -387,8 +715,9 @@ def main(statisticsfile, misafile, repeatclasses):
         outfile.write("---------  Mono-nucleotides\n")
         percent_repeat_type = percent_repeat(dict_type_mono)
         for repeat_type in ['A/T', 'C/G']:
-            abundance = dict_type_mono[repeat_type]
-            outfile.write(out_format.format(repeat_type, percent_repeat_type[repeat_type], abundance))
+            # a zero row if there is no SSR of the class
+            abundance = dict_type_mono.get(repeat_type, 0)
+            outfile.write(out_format.format(repeat_type, percent_repeat_type.get(repeat_type, 0.0), abundance))
 
         outfile.write("---------  Di-nucleotides\n")
         percent_repeat_type = percent_repeat(dict_type_di)
@@ -399,31 +728,11 @@ def main(statisticsfile, misafile, repeatclasses):
         # ----- Tri- to Dec-nucleotides
         repeat_types = [dict_type_tri, dict_type_tetra, dict_type_penta, dict_type_hexa, dict_type_septa,
                         dict_type_octa, dict_type_nona, dict_type_deca]
-        unit_length = 2
-        for dictType in repeat_types:
-            unit_length += 1
+        for unit_length, dictType in enumerate(repeat_types, 3):
             if unit_length > max_repeat_unit_length:
                 break
-            else:
-                type_length = len(list(dictType.keys())[0])
-            if type_length == 7:
-                outfile.write("---------  Tri-nucleotides\n")
-            elif type_length == 9:
-                outfile.write("---------  Tetra-nucleotides\n")
-            elif type_length == 11:
-                outfile.write("---------  Penta-nucleotides\n")
-            elif type_length == 13:
-                outfile.write("---------  Hexa-nucleotides\n")
-            elif type_length == 15:
-                outfile.write("---------  Septa-nucleotides\n")
-            elif type_length == 17:
-                outfile.write("---------  Octa-nucleotides\n")
-            elif type_length == 19:
-                outfile.write("---------  Nona-nucleotides\n")
-            elif type_length == 21:
-                outfile.write("---------  Deca-nucleotides\n")
-            else:
-                outfile.write("--------- \n")
+            # header by the unit size, a unit size without SSRs has no rows
+            outfile.write("---------  {}-nucleotides\n".format(repeat_len_name[unit_length]))
 
             percent_repeat_type = percent_repeat(dictType)
             # sort first by length of k and then by k
@@ -433,13 +742,38 @@ def main(statisticsfile, misafile, repeatclasses):
                 percent = percent_repeat_type[repeat_type]
                 if percent > 1.0:
                     outfile.write(out_format.format(repeat_type, percent, abundance))
+    # like statgetlongest.getlineslongest() reads them from the output file
+    return [line.rstrip() for line in longest_lines]
 
 
 if __name__ == '__main__':
     parser = argparse.ArgumentParser()
-    parser.add_argument("statisticfile", help="MISA statistics file")
-    parser.add_argument("misafile", help="MISA file")
+    parser.add_argument("files", nargs="+", metavar="file",
+                        help="MISA statistics file and MISA file, with -db only the MISA file, "
+                             "- for standard input")
     parser.add_argument("-rpc", "--repeatclasses", help="include SSR repeat classes", action="store_true")
+    parser.add_argument("-db", "--dbfile", help="calculate the statistics from the MISA file and this db file")
+    parser.add_argument("-ini", "--inifile", help="misa.ini with the definement of microsatellites (with -db)")
+    parser.add_argument("-dm", "--distribution", help="write the distribution matrices of the SSRs",
+                        action="store_true")
+    parser.add_argument("-pa", "--partial", help="write only the counts of SSRs to be merged (with -db)",
+                        action="store_true")
+    parser.add_argument("-o", "--out", help="output file, - for standard output "
+                        "(default {} or with -pa {})".format(out_filename, out_filename_partial))
+    parser.add_argument("-od", "--outdistribution", help="prefix of the files of the distribution matrices "
+                        "(default {})".format(out_prefix_distribution), default=out_prefix_distribution)
     args = parser.parse_args()
-    if args.statisticfile and args.misafile:
-        main(args.statisticfile, args.misafile, args.repeatclasses)
+    if args.files.count(fileio.stdio_name) > 1:
+        parser.error("only one file can be read from standard input")
+    if args.partial and not args.dbfile:
+        parser.error("-pa needs the db file (-db)")
+    if args.dbfile:
+        if len(args.files) != 1:
+            parser.error("with -db only the MISA file is needed")
+        main(None, args.files[0], args.repeatclasses, args.dbfile, args.inifile, args.partial, args.distribution,
+             args.out, args.outdistribution)
+    else:
+        if len(args.files) != 2:
+            parser.error("the MISA statistics file and the MISA file are needed")
+        main(args.files[0], args.files[1], args.repeatclasses, distribution=args.distribution, outname=args.out,
+             outprefix_distribution=args.outdistribution)
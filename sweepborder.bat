@@ -0,0 +1 @@
+python %~dp0sweepborder.py %*
\ No newline at end of file
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""Create the border file for a border length from the output of getsequences.py -s
+
+getsequences.py with the option -s writes for each repeat the longest border
+up- and downstream without N into border-sweep.txt. This program selects
+the repeats with a border of at least n bp from it, without reading the db
+file again.
+
+Usage:
+sweepborder.py border-sweep.txt <border-length-in-bp> [-o <output-file>]
+
+With - as input file border-sweep.txt is read from standard input.
+
+Output:
+border.txt (or the file of -o, - for standard output)
+
+Author: Mario Nenno
+Version: 2015-08-31
+Copyright: see file LICENCE.txt
+
+"""
+import os
+import sys
+import time
+import argparse
+
+import fileio
+
+# program version
+_version_ = '1.0'
+
+# output file
+out_filename = "border.txt"
+
+
+def readsweep(filename):
+    """ Read the header values and the repeats with their max border
+    """
+    header = {}
+    repeats = []
+    with fileio.open_text(filename) as infile:
+        is_start = False
+        for line in infile:
+            line = line.rstrip()
+            if line.startswith("====="):
+                is_start = True
+            elif is_start and len(line) > 0:
+                # Id   SSR nr.  type SSR   size start end  upstream downstream max border
+                # PK13324.1	1   p2	(TC)15	30	29	 58    120      45         45
+                # 0         1   2   3        4   5    6     7        8          9
+                items = line.split("\t")
+                repeats.append((items[:7], int(items[9])))
+            elif is_start:
+                break
+            elif ": " in line:
+                key, value = line.split(": ", 1)
+                header[key] = value
+    return header, repeats
+
+
+def main(sweepfile, border, outname=out_filename):
+    """Main function
+
+    Returns the repeats with border as items of a MISA line.
+    """
+    # Start timing
+    start_time = time.time()
+
+    border_len = int(border)
+    header, repeats = readsweep(sweepfile)
+    repeats_border_ok = [items for items, max_border in repeats if max_border >= border_len]
+
+    # write the list of repeats like getsequences.py
+    execution_time = time.time() - start_time
+    if len(repeats_border_ok) > 0:
+        with fileio.open_output(outname) as border_file:
+            border_file.write("Program: {} {}\n".format(os.path.basename(sys.argv[0]), _version_))
+            border_file.write("Date: {} , duration: {:.2f} sec\n".format(time.strftime("%Y-%m-%d %H:%M"), execution_time))
+            border_file.write("Repeats file: {}\n".format(header.get("Repeats file", "")))
+            border_file.write("Db file: {}\n".format(header.get("Db file", "")))
+            border_file.write("{} repeats with border ({} bp)\n".format(len(repeats_border_ok), border))
+            border_file.write("=" * 80 + "\n")
+            for items in repeats_border_ok:
+                border_file.write("{}\n".format("\t".join(items)))
+    return repeats_border_ok
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument("sweepfile", help="output of getsequences.py with option -s, - for standard input")
+    parser.add_argument("border", help="must have n pb border up- and downstream")
+    parser.add_argument("-o", "--out", help="output file, - for standard output (default {})".format(out_filename),
+                        default=out_filename)
+    args = parser.parse_args()
+    if args.sweepfile and args.border:
+        main(args.sweepfile, args.border, args.out)